@@ -5,8 +5,10 @@ import time
 # On essaie d'importer vos modules
 try:
     from donnees import get_market_data, add_indicators, calculate_fibonacci
+    from barres import Bars
+    from partage import attach
     from intelligence import generate_ai_analysis
-    from backtest import FibonacciBacktester, plot_backtest_results
+    from backtest import iter_backtest, plot_backtest_results
 except ImportError as e:
     st.error(f"❌ Erreur d'importation : {e}")
     st.stop()
@@ -41,19 +43,30 @@ st.sidebar.write("- Étudiante 2 (IA)")
 st.sidebar.write("- Étudiante 3 (Backtest)")
 
 # --- 1. CHARGEMENT DES DONNÉES ---
-@st.cache_data # Pour ne pas recharger à chaque clic
+# cache_resource : un seul Bars par symbole, partagé tel quel entre les reruns et
+# les sessions (cache_data le recopierait à chaque lecture). On ne le modifie
+# jamais : le backtester travaille sur une vue.
+@st.cache_resource(ttl=3600) # Pour ne pas recharger à chaque clic
 def charger_donnees(symbol):
-    df = get_market_data(symbol)
-    df = add_indicators(df)
-    return df
+    bars = Bars.from_pandas(get_market_data(symbol))
+    add_indicators(bars)
+    return bars
+
+def obtenir_barres(symbol):
+    # Serveur de données lancé (python cli.py serve GC=F ^NDX) : toutes les sessions
+    # lisent la même mémoire partagée, sans copie, et voient chaque nouvelle version
+    try:
+        return attach(symbol)
+    except FileNotFoundError:
+        return charger_donnees(symbol)
 
 with st.spinner(f'Téléchargement des données pour {choix_actif}...'):
-    df = charger_donnees(ticker)
-    fibs, high, low, trend = calculate_fibonacci(df)
+    bars = obtenir_barres(ticker)
+    fibs, high, low, trend = calculate_fibonacci(bars)
 
 # Affichage des métriques en haut
-last_price = df['Close'].iloc[-1]
-last_rsi = df['RSI'].iloc[-1]
+last_price = bars['Close'][-1]
+last_rsi = bars['RSI'][-1]
 tendance_icon = "📈" if trend == "up" else "📉"
 
 col1, col2, col3, col4 = st.columns(4)
@@ -74,9 +87,9 @@ with col_ia_1:
 with col_ia_2:
     if bouton_ia:
         with st.spinner("L'IA réfléchit..."):
-            # Préparation des données MACD
-            macd_line = df.iloc[-1, -2]
-            macd_signal = df.iloc[-1, -1]
+            # Préparation des données MACD (colonnes par leur nom)
+            macd_line = bars['MACD_12_26_9'][-1]
+            macd_signal = bars['MACDs_12_26_9'][-1]
             
             # Appel à votre fonction IA
             resultat = generate_ai_analysis(
@@ -106,29 +119,62 @@ st.header("📊 Performance Historique (Backtest)")
 
 st.write("Simulation de la stratégie sur les données passées avec Stop Loss (2%) et Take Profit (5%).")
 
-if st.button("🚀 LANCER LE BACKTEST"):
-    with st.spinner("Simulation des trades en cours..."):
-        # Initialisation du testeur (Code Étudiante 3)
-        tester = FibonacciBacktester(df, initial_capital=10000)
-        tester.generate_signals(calculate_fibonacci, lookback=50)
-        tester.run_backtest(stop_loss_pct=2.0, take_profit_pct=5.0)
-        metrics = tester.get_metrics()
-        
-        # Affichage des gros chiffres (Métriques)
-        m1, m2, m3, m4 = st.columns(4)
-        m1.metric("Win Rate", f"{metrics['win_rate']}%")
-        m2.metric("Profit Total", f"{metrics['total_return']}%")
-        m3.metric("Profit Factor", f"{metrics['profit_factor']}")
-        m4.metric("Trades Total", f"{metrics['total_trades']}")
-        
-        # Affichage du graphique interactif
-        st.subheader("Graphique des Trades")
-        fig = plot_backtest_results(tester.df, tester.trades, market=choix_actif)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Conclusion automatique
-        if metrics['win_rate'] > 50:
-            st.balloons()
-            st.success("✅ La stratégie est rentable sur la période testée !")
-        else:
-            st.warning("⚠️ La stratégie nécessite des ajustements (Win Rate < 50%).")
+col_lancer, col_arret = st.columns([3, 1])
+lancer = col_lancer.button("🚀 LANCER LE BACKTEST")
+# Un clic relance le script : le backtest en cours (générateur) est abandonné
+col_arret.button("⏹️ ARRÊTER")
+
+if lancer:
+    progression = st.progress(0.0, text="Simulation des trades en cours...")
+    
+    # Emplacements des gros chiffres (Métriques), remplis au fil du calcul
+    m1, m2, m3, m4 = st.columns(4)
+    cases = [m1.empty(), m2.empty(), m3.empty(), m4.empty()]
+    
+    def afficher_metriques(metrics):
+        cases[0].metric("Win Rate", f"{metrics['win_rate']}%")
+        cases[1].metric("Profit Total", f"{metrics['total_return']}%")
+        cases[2].metric("Profit Factor", f"{metrics['profit_factor']}")
+        cases[3].metric("Trades Total", f"{metrics['total_trades']}")
+    
+    st.subheader("Évolution du Portfolio")
+    zone_courbe = st.empty()
+    courbe = None
+    resultat = None
+    
+    # Une mise à jour tous les ~2 % de l'historique (au moins 100 barres)
+    for evenement in iter_backtest(bars, initial_capital=10000, lookback=50,
+                                   stop_loss_pct=2.0, take_profit_pct=5.0,
+                                   every=max(100, len(bars) // 50)):
+        if evenement['type'] == 'equity':
+            morceau = pd.DataFrame({'Portfolio': evenement['portfolio']}, index=evenement['dates'])
+            if courbe is None:
+                courbe = zone_courbe.line_chart(morceau)
+            else:
+                courbe.add_rows(morceau)
+        elif evenement['type'] == 'metrics':
+            afficher_metriques(evenement['metrics'])
+        elif evenement['type'] == 'progress':
+            progression.progress(evenement['done'] / evenement['total'],
+                                 text=f"Simulation : {evenement['done']}/{evenement['total']} barres")
+        elif evenement['type'] == 'done':
+            resultat = evenement
+    
+    progression.empty()
+    metrics = resultat['metrics']
+    afficher_metriques(metrics)
+    
+    # Affichage du graphique interactif (vue sur les barres : aucune copie)
+    st.subheader("Graphique des Trades")
+    vue = bars[:]
+    vue['SIGNAL'] = resultat['signal']
+    vue['PORTFOLIO'] = resultat['portfolio']
+    fig = plot_backtest_results(vue, resultat['trades'], market=choix_actif)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Conclusion automatique
+    if metrics['win_rate'] > 50:
+        st.balloons()
+        st.success("✅ La stratégie est rentable sur la période testée !")
+    else:
+        st.warning("⚠️ La stratégie nécessite des ajustements (Win Rate < 50%).")
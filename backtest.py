@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from collections import deque
 from datetime import datetime
 import json
+import math
+import os
+import time
+
+from barres import Bars
+from donnees import fibonacci_levels
+from indicateurs import RSIState, MACDState
 
 # ============================================================================
 # 1️⃣ CLASSE BACKTESTING
@@ -17,11 +23,12 @@ class FibonacciBacktester:
     def __init__(self, df, initial_capital=10000, trade_size=0.95):
         """
         Args:
-            df : DataFrame avec colonnes ['Close', 'High', 'Low', 'RSI', 'MACD', etc.]
+            df : DataFrame ou barres.Bars avec colonnes ['Close', 'High', 'Low', 'RSI', 'MACD', etc.]
             initial_capital : Capital de départ en $
             trade_size : % du capital à utiliser par trade (0.95 = 95%)
         """
-        self.df = df.copy()
+        # Bars : simple vue, les colonnes SIGNAL / PORTFOLIO n'atteignent pas l'original
+        self.df = df[:] if isinstance(df, Bars) else df.copy()
         self.initial_capital = initial_capital
         self.trade_size = trade_size
         
@@ -40,20 +47,21 @@ class FibonacciBacktester:
             lookback : Nombre de jours pour calculer Fibonacci
         """
         signals = []
+        # Colonnes lues une fois (accès par position bien plus rapide que .iloc[i])
+        closes = np.asarray(self.df['Close'])
+        rsis = np.asarray(self.df['RSI']) if 'RSI' in self.df.columns else np.full(len(closes), 50)
         
         for i in range(lookback, len(self.df)):
-            window = self.df.iloc[:i+1].tail(lookback)
-            
-            # Récupérer Fibonacci
+            # Récupérer Fibonacci (self.df[:i+1] : lignes par position, DataFrame comme Bars)
             try:
-                fib_levels, h, l, trend = fib_levels_func(self.df.iloc[:i+1])
+                fib_levels, h, l, trend = fib_levels_func(self.df[:i+1])
             except:
                 signals.append('HOLD')
                 continue
             
             # Données actuelles
-            close = self.df['Close'].iloc[i]
-            rsi = self.df['RSI'].iloc[i] if 'RSI' in self.df.columns else 50
+            close = closes[i]
+            rsi = rsis[i]
             
             # Logique de signal
             signal = self._determine_signal(close, rsi, fib_levels, trend, h, l)
@@ -65,7 +73,21 @@ class FibonacciBacktester:
         
         return self.df
     
-    def _determine_signal(self, close, rsi, fib_levels, trend, high, low):
+    def generate_model_signals(self, model, min_confidence=0.0):
+        """
+        Alternative à generate_signals : signaux d'un modèle local
+        (modele.SignalModel, ou tout objet avec une méthode signals(df, min_confidence)),
+        calculés en une seule passe vectorisée sur tout l'historique.
+        
+        Args:
+            model : modèle entraîné (voir modele.train_signal_model)
+            min_confidence : probabilité minimale pour ACHAT / VENTE (sinon HOLD)
+        """
+        self.df['SIGNAL'] = model.signals(self.df, min_confidence=min_confidence)
+        return self.df
+    
+    @staticmethod
+    def _determine_signal(close, rsi, fib_levels, trend, high, low):
         """
         Détermine le signal [ACHAT], [VENTE], [HOLD] basé sur la logique.
         """
@@ -97,10 +119,20 @@ class FibonacciBacktester:
         capital = self.initial_capital
         position = None  # {'entry_price': X, 'entry_idx': Y, 'type': 'LONG'}
         
+        # On repart de zéro : un second appel ne doit pas s'ajouter au premier
+        self.trades = []
+        self.portfolio_values = []
+        self.entry_prices = []
+        self.exit_prices = []
+        
+        signals = np.asarray(self.df['SIGNAL'])
+        closes = np.asarray(self.df['Close'])
+        dates = self.df.index
+        
         for i in range(len(self.df)):
-            signal = self.df['SIGNAL'].iloc[i]
-            close = self.df['Close'].iloc[i]
-            date = self.df.index[i]
+            signal = signals[i]
+            close = closes[i]
+            date = dates[i]
             
             # === GESTION DE POSITION EXISTANTE ===
             if position is not None:
@@ -233,6 +265,309 @@ class FibonacciBacktester:
         }
 
 
+class StreamingBacktester:
+    """
+    Même stratégie que FibonacciBacktester, mais barre par barre (flux temps réel).
+
+    Les indicateurs (RSI, MACD), la fenêtre Fibonacci et la position sont mis à
+    jour à chaque update() en O(lookback), sans recalculer tout l'historique.
+    Sur les mêmes barres, on obtient les mêmes signaux et trades que
+    generate_signals(calculate_fibonacci avec la même fenêtre) + run_backtest().
+
+    L'état complet (position, capital, indicateurs, fenêtre, dernière barre,
+    accumulateurs de métriques) tient dans un petit snapshot JSON : quand une
+    nouvelle barre arrive, on recharge le snapshot et on ne traite qu'elle.
+
+        bt = StreamingBacktester.load("or.json")   # ou StreamingBacktester()
+        bt.process(df)                              # seulement les nouvelles barres
+        bt.save("or.json")
+        bt.get_metrics()                            # = FibonacciBacktester sur tout df
+    """
+
+    def __init__(self, initial_capital=10000, trade_size=0.95, lookback=50,
+                 stop_loss_pct=2.0, take_profit_pct=5.0):
+        self.initial_capital = initial_capital
+        self.trade_size = trade_size
+        self.lookback = lookback
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+
+        self.rsi = RSIState(14)
+        self.macd = MACDState(12, 26, 9)
+        self.highs = deque(maxlen=lookback)
+        self.lows = deque(maxlen=lookback)
+
+        self.index = 0  # numéro de la prochaine barre
+        self.last_date = None
+        self.capital = initial_capital
+        self.position = None
+        self.trades = []  # trades fermés depuis la création / le chargement
+
+        # Accumulateurs des métriques (pas d'historique complet à garder)
+        self.portfolio = initial_capital
+        self.peak = None
+        self.min_drawdown = 0.0
+        self.n_returns = 0
+        self.mean_return = 0.0
+        self.m2_return = 0.0
+        self.n_wins = 0
+        self.n_losses = 0
+        self.sum_wins = 0.0
+        self.sum_losses = 0.0
+
+    def _signal(self, close, rsi):
+        """Signal de la barre courante (HOLD tant que la fenêtre n'est pas pleine)."""
+        if self.index < self.lookback:
+            return 'HOLD'
+        highs, lows = self.highs, self.lows
+        high_price = max(highs)
+        low_price = min(lows)
+        # Premier plus haut / premier plus bas, comme idxmax / idxmin
+        trend = 'down' if highs.index(high_price) > lows.index(low_price) else 'up'
+        levels = fibonacci_levels(high_price, low_price, trend)
+        return FibonacciBacktester._determine_signal(close, rsi, levels, trend, high_price, low_price)
+
+    def update(self, date, high, low, close):
+        """
+        Traite une nouvelle barre.
+
+        Returns:
+            dict : index, date, signal, portfolio, rsi, macd, trade (dict ou None)
+        """
+        i = self.index
+        rsi = self.rsi.update(close)
+        macd = self.macd.update(close)
+        self.highs.append(high)
+        self.lows.append(low)
+        signal = self._signal(close, rsi)
+
+        # === GESTION DE POSITION EXISTANTE (identique à run_backtest) ===
+        trade = None
+        if self.position is not None:
+            entry_price = self.position['entry_price']
+            pnl_pct = ((close - entry_price) / entry_price) * 100
+            if pnl_pct < -self.stop_loss_pct:
+                trade = self._close_trade(i, close, entry_price, 'STOP LOSS', date)
+            elif pnl_pct > self.take_profit_pct:
+                trade = self._close_trade(i, close, entry_price, 'TAKE PROFIT', date)
+
+        # === OUVERTURE DE NOUVELLE POSITION ===
+        if self.position is None and signal in ('ACHAT', 'VENTE'):
+            self.position = {
+                'entry_price': close,
+                'entry_idx': i,
+                'type': 'LONG' if signal == 'ACHAT' else 'SHORT',
+                'qty': (self.capital * self.trade_size) / close
+            }
+
+        # === MISE À JOUR CAPITAL ===
+        portfolio = self.capital
+        if self.position is not None:
+            portfolio += (close - self.position['entry_price']) * self.position['qty']
+        self._accumuler(portfolio)
+
+        self.index += 1
+        self.last_date = date
+        return {'index': i, 'date': date, 'signal': signal, 'portfolio': portfolio,
+                'rsi': rsi, 'macd': macd, 'trade': trade}
+
+    def _accumuler(self, portfolio):
+        """Met à jour drawdown et rendements (mêmes formules que get_metrics)."""
+        if self.peak is None:
+            self.peak = portfolio
+        else:
+            rendement = (portfolio - self.portfolio) / self.portfolio
+            # Moyenne / variance en ligne (Welford)
+            self.n_returns += 1
+            delta = rendement - self.mean_return
+            self.mean_return += delta / self.n_returns
+            self.m2_return += delta * (rendement - self.mean_return)
+            self.peak = max(self.peak, portfolio)
+        self.min_drawdown = min(self.min_drawdown, (portfolio - self.peak) / self.peak)
+        self.portfolio = portfolio
+
+    def process(self, df):
+        """
+        Traite les barres de df postérieures à la dernière barre déjà traitée.
+
+        Args:
+            df : DataFrame ou barres.Bars avec High / Low / Close et un index trié (dates)
+        """
+        debut = 0 if self.last_date is None else df.index.searchsorted(self.last_date, side='right')
+        for date, high, low, close in zip(df.index[debut:], np.asarray(df['High'])[debut:].tolist(),
+                                          np.asarray(df['Low'])[debut:].tolist(),
+                                          np.asarray(df['Close'])[debut:].tolist()):
+            self.update(date, high, low, close)
+        return self
+
+    def get_metrics(self):
+        """Mêmes métriques que FibonacciBacktester.get_metrics, depuis les accumulateurs."""
+        total_trades = self.n_wins + self.n_losses
+        if total_trades == 0:
+            return {
+                'total_trades': 0,
+                'win_rate': 0,
+                'profit_factor': 0,
+                'max_drawdown': 0,
+                'sharpe_ratio': 0,
+                'total_return': 0,
+                'avg_win': 0,
+                'avg_loss': 0,
+                'risk_reward_ratio': 0
+            }
+
+        win_rate = (self.n_wins / total_trades) * 100
+        total_losses = abs(self.sum_losses)
+        profit_factor = self.sum_wins / total_losses if total_losses > 0 else 0
+        std = math.sqrt(self.m2_return / self.n_returns) if self.n_returns > 0 else 0
+        sharpe_ratio = (self.mean_return / std) * math.sqrt(252) if std > 0 else 0
+        total_return = ((self.portfolio - self.initial_capital) / self.initial_capital) * 100
+        avg_win = self.sum_wins / self.n_wins if self.n_wins > 0 else 0
+        avg_loss = self.sum_losses / self.n_losses if self.n_losses > 0 else 0
+        risk_reward = abs(avg_win / avg_loss) if avg_loss != 0 else 0
+
+        return {
+            'total_trades': total_trades,
+            'win_rate': round(win_rate, 2),
+            'profit_factor': round(profit_factor, 2),
+            'max_drawdown': round(self.min_drawdown * 100, 2),
+            'sharpe_ratio': round(sharpe_ratio, 2),
+            'total_return': round(total_return, 2),
+            'avg_win': round(avg_win, 2),
+            'avg_loss': round(avg_loss, 2),
+            'risk_reward_ratio': round(risk_reward, 2)
+        }
+
+    # --- Snapshot / reprise ---------------------------------------------------
+
+    _PARAMETRES = ('initial_capital', 'trade_size', 'lookback', 'stop_loss_pct', 'take_profit_pct')
+    _COMPTEURS = ('index', 'capital', 'portfolio', 'peak', 'min_drawdown', 'n_returns',
+                  'mean_return', 'm2_return', 'n_wins', 'n_losses', 'sum_wins', 'sum_losses')
+
+    def snapshot(self):
+        """État complet sous forme de dict sérialisable en JSON (sans l'historique)."""
+        last_date = self.last_date
+        if hasattr(last_date, 'isoformat'):
+            last_date = {'timestamp': last_date.isoformat()}
+        return {
+            'version': 1,
+            'params': {k: getattr(self, k) for k in self._PARAMETRES},
+            'state': {k: getattr(self, k) for k in self._COMPTEURS},
+            'last_date': last_date,
+            'position': self.position,
+            'highs': list(self.highs),
+            'lows': list(self.lows),
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        bt = cls(**snap['params'])
+        for k, v in snap['state'].items():
+            setattr(bt, k, v)
+        last_date = snap['last_date']
+        if isinstance(last_date, dict):
+            last_date = pd.Timestamp(last_date['timestamp'])
+        bt.last_date = last_date
+        bt.position = snap['position']
+        bt.highs.extend(snap['highs'])
+        bt.lows.extend(snap['lows'])
+        bt.rsi = RSIState.from_dict(snap['rsi'])
+        bt.macd = MACDState.from_dict(snap['macd'])
+        return bt
+
+    def save(self, path):
+        """Écrit le snapshot (fichier temporaire + remplacement atomique)."""
+        temporaire = f"{path}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, separators=(',', ':'))
+        os.replace(temporaire, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_snapshot(json.load(f))
+
+    def _close_trade(self, exit_idx, exit_price, entry_price, exit_reason, date):
+        pnl = (exit_price - entry_price) * ((self.capital * self.trade_size) / entry_price)
+        trade = {
+            'exit_idx': exit_idx,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'pnl': pnl,
+            'pnl_pct': ((exit_price - entry_price) / entry_price) * 100,
+            'exit_reason': exit_reason,
+            'date': date,
+            'exit_capital': self.capital + pnl
+        }
+        self.trades.append(trade)
+        if pnl > 0:
+            self.n_wins += 1
+            self.sum_wins += pnl
+        else:
+            self.n_losses += 1
+            self.sum_losses += pnl
+        self.capital = trade['exit_capital']
+        self.position = None
+        return trade
+
+
+def iter_backtest(df, initial_capital=10000, trade_size=0.95, lookback=50,
+                  stop_loss_pct=2.0, take_profit_pct=5.0, every=250, engine=None):
+    """
+    Backtest progressif : générateur qui produit des événements au fil du calcul
+    (même stratégie et mêmes résultats que generate_signals + run_backtest).
+
+    Événements (dict avec une clé 'type') :
+        'trade'    : dès qu'un trade se ferme → trade
+        'equity'   : toutes les `every` barres → start, stop, dates, close, signal, portfolio
+                     (tableaux du morceau [start, stop), en vues : pas de copie)
+        'metrics'  : juste après chaque 'equity' → metrics (comme get_metrics)
+        'progress' : juste après → done, total, seconds
+        'done'     : à la fin → metrics, trades, signal, portfolio (tableaux complets), seconds
+
+    Le calcul n'avance que quand on demande l'événement suivant : arrêter la
+    boucle (break, exception, rerun Streamlit) ou appeler .close() l'arrête.
+
+    Args:
+        df : DataFrame ou barres.Bars (High / Low / Close, index de dates)
+        every : nombre de barres entre deux mises à jour (equity / metrics / progress)
+        engine : StreamingBacktester à prolonger (défaut : un nouveau avec ces paramètres)
+    """
+    bt = engine or StreamingBacktester(initial_capital, trade_size, lookback,
+                                       stop_loss_pct, take_profit_pct)
+    every = max(1, int(every))
+    dates = df.index
+    highs = np.asarray(df['High']).tolist()
+    lows = np.asarray(df['Low']).tolist()
+    closes = np.asarray(df['Close'])
+    total = len(closes)
+    signaux = np.empty(total, dtype='<U5')
+    portfolio = np.empty(total)
+
+    debut = time.perf_counter()
+    for start in range(0, total, every):
+        stop = min(start + every, total)
+        for i, date, high, low, close in zip(range(start, stop), dates[start:stop], highs[start:stop],
+                                             lows[start:stop], closes[start:stop].tolist()):
+            evenement = bt.update(date, high, low, close)
+            signaux[i] = evenement['signal']
+            portfolio[i] = evenement['portfolio']
+            if evenement['trade'] is not None:
+                yield {'type': 'trade', 'trade': evenement['trade']}
+
+        yield {'type': 'equity', 'start': start, 'stop': stop, 'dates': dates[start:stop],
+               'close': closes[start:stop], 'signal': signaux[start:stop],
+               'portfolio': portfolio[start:stop]}
+        yield {'type': 'metrics', 'metrics': bt.get_metrics()}
+        yield {'type': 'progress', 'done': stop, 'total': total,
+               'seconds': time.perf_counter() - debut}
+
+    yield {'type': 'done', 'metrics': bt.get_metrics(), 'trades': bt.trades,
+           'signal': signaux, 'portfolio': portfolio, 'seconds': time.perf_counter() - debut}
+
+
 # ============================================================================
 # 2️⃣ VISUALISATION GRAPHIQUE
 # ============================================================================
@@ -245,6 +580,9 @@ def plot_backtest_results(df, trades, market="OR"):
     - Portfolio value
     - Indicateurs (RSI, MACD)
     """
+    # Import local : plotly n'est utile que pour les graphiques
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     fig = make_subplots(
         rows=3, cols=1,
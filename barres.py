@@ -0,0 +1,275 @@
+# barres.py - Conteneur de barres en colonnes (OHLCV + indicateurs + Fibonacci)
+#
+# Alternative légère au DataFrame pour faire circuler les barres entre
+# donnees.py, backtest.py, main.py et app.py :
+# - une colonne = un tableau NumPy contigu, nommé et typé (pas de lookup par position)
+# - découpage sans copie : bars[100:200] partage la mémoire de bars
+# - ajout en fin (append / extend) avec capacité doublée : coût amorti O(1) par barre
+# - conversion vers / depuis pandas sans recopier les colonnes
+#
+# Une vue (bars[a:b], bars[:]) a son propre jeu de colonnes : en ajouter une
+# (ex : SIGNAL dans le backtester) ne modifie pas le conteneur d'origine.
+
+import numpy as np
+import pandas as pd
+
+_CAPACITE_MIN = 64
+_NS_PAR_UNITE = {'s': 10**9, 'ms': 10**6, 'us': 10**3, 'ns': 1}
+
+
+class Bars:
+    """
+    Barres en colonnes, indexées par date.
+
+    Exemple :
+        bars = Bars.from_pandas(get_market_data("GC=F"))
+        add_indicators(bars)                  # colonnes RSI, MACD_12_26_9, ...
+        bars['MACDs_12_26_9'][-1]             # dernière valeur, par nom
+        recent = bars.tail(50)                # vue, aucune copie
+        bars.append(date, Open=..., High=..., Low=..., Close=..., Volume=...)
+        df = bars.to_pandas()
+    """
+
+    __slots__ = ('_dates', '_colonnes', '_n', '_tz')
+
+    def __init__(self, dates=None, columns=None, tz=None):
+        """
+        Args:
+            dates : tableau datetime64 (ou int64 en ns), trié
+            columns : {nom: tableau 1-D de même longueur que dates}
+            tz : fuseau horaire des dates (None = dates naïves)
+        """
+        dates = np.zeros(0, dtype=np.int64) if dates is None else np.asarray(dates)
+        if dates.dtype.kind == 'M':
+            dates = dates.astype('M8[ns]', copy=False).view(np.int64)
+        self._dates = dates
+        self._n = len(dates)
+        self._tz = tz
+        self._colonnes = {}
+        for nom, valeurs in (columns or {}).items():
+            self[nom] = valeurs
+
+    # --- Conversion pandas ------------------------------------------------------
+
+    @classmethod
+    def from_pandas(cls, df, columns=None):
+        """
+        Construit un Bars depuis un DataFrame à index DatetimeIndex.
+        Les colonnes numériques ne sont pas recopiées quand pandas les stocke
+        déjà en tableaux contigus (cas de get_market_data / BarStore).
+        """
+        index = pd.DatetimeIndex(df.index)
+        # asi8 est en UTC pour un index avec fuseau ; as_unit('ns') est beaucoup plus lent
+        dates = index.asi8 * _NS_PAR_UNITE[index.unit] if index.unit != 'ns' else index.asi8
+        noms = df.columns if columns is None else columns
+        return cls(dates, {nom: df[nom].to_numpy() for nom in noms}, tz=index.tz)
+
+    def to_pandas(self):
+        """DataFrame qui référence les colonnes (pas de copie)."""
+        return pd.DataFrame(dict(self._vues()), index=self.index, copy=False)
+
+    # --- Accès ------------------------------------------------------------------
+
+    def __len__(self):
+        return self._n
+
+    def __contains__(self, nom):
+        return nom in self._colonnes
+
+    def __repr__(self):
+        return f"<Bars {self._n} barres × {len(self._colonnes)} colonnes : {', '.join(self._colonnes)}>"
+
+    @property
+    def columns(self):
+        return list(self._colonnes)
+
+    @property
+    def dates(self):
+        """Dates en datetime64[ns] (UTC si un fuseau est défini), sans copie."""
+        return self._dates[:self._n].view('M8[ns]')
+
+    @property
+    def index(self):
+        index = pd.DatetimeIndex(self.dates, name='Date')
+        return index.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else index
+
+    def _vues(self):
+        n = self._n
+        return ((nom, colonne[:n]) for nom, colonne in self._colonnes.items())
+
+    def __getitem__(self, cle):
+        """
+        bars['Close'] → tableau (vue) ; bars[10:20] / bars[['High', 'Low']] → Bars (vue) ;
+        bars[masque] ou bars[[3, 5, 8]] → Bars (copie des lignes choisies).
+        """
+        if isinstance(cle, str):
+            return self._colonnes[cle][:self._n]
+        if isinstance(cle, slice):
+            debut, fin, pas = cle.indices(self._n)
+            if pas != 1:
+                return self._lignes(np.arange(debut, fin, pas))
+            fin = max(debut, fin)
+            return self._nouveau(self._dates[debut:fin],
+                                 {nom: col[debut:fin] for nom, col in self._colonnes.items()})
+        if isinstance(cle, list) and all(isinstance(nom, str) for nom in cle):
+            return self._nouveau(self._dates[:self._n],
+                                 {nom: self._colonnes[nom][:self._n] for nom in cle})
+        return self._lignes(np.asarray(cle))
+
+    def _lignes(self, positions):
+        return self._nouveau(self._dates[:self._n][positions],
+                             {nom: col[positions] for nom, col in self._vues()})
+
+    def _nouveau(self, dates, colonnes):
+        bars = Bars.__new__(Bars)
+        bars._dates = dates
+        bars._n = len(dates)
+        bars._tz = self._tz
+        bars._colonnes = colonnes
+        return bars
+
+    def __setitem__(self, nom, valeurs):
+        """Ajoute ou remplace une colonne (longueur = nombre de barres)."""
+        valeurs = np.asarray(valeurs)
+        if valeurs.ndim != 1 or len(valeurs) != self._n:
+            raise ValueError(f"La colonne '{nom}' doit avoir {self._n} valeurs (reçu {valeurs.shape}).")
+        capacite = len(self._dates)
+        if capacite == self._n:
+            self._colonnes[nom] = np.ascontiguousarray(valeurs)
+        else:
+            colonne = np.empty(capacite, dtype=valeurs.dtype)
+            colonne[:self._n] = valeurs
+            self._colonnes[nom] = colonne
+
+    def tail(self, n=5):
+        return self[max(self._n - n, 0):]
+
+    def head(self, n=5):
+        return self[:n]
+
+    # --- Croissance -------------------------------------------------------------
+
+    def _reserver(self, taille):
+        """Garantit une capacité ≥ taille (doublement : ajouts en O(1) amorti)."""
+        capacite = len(self._dates)
+        if taille <= capacite:
+            return
+        capacite = max(taille, 2 * capacite, _CAPACITE_MIN)
+        n = self._n
+        dates = np.empty(capacite, dtype=np.int64)
+        dates[:n] = self._dates[:n]
+        self._dates = dates
+        for nom, ancienne in self._colonnes.items():
+            colonne = np.empty(capacite, dtype=ancienne.dtype)
+            colonne[:n] = ancienne[:n]
+            self._colonnes[nom] = colonne
+
+    def _dernier_ns(self):
+        return self._dates[self._n - 1] if self._n else None
+
+    def append(self, date, **valeurs):
+        """
+        Ajoute une barre en fin. Les colonnes absentes de `valeurs` reçoivent
+        NaN (flottants) ou la valeur nulle du type (ex : indicateurs pas encore calculés).
+        Une vue est d'abord détachée de son parent (réallocation) : elle ne l'écrase jamais.
+        """
+        ns = _en_ns(date, self._tz)
+        if self._n and ns < self._dernier_ns():
+            raise ValueError(f"Barre antérieure à la dernière barre ({date}).")
+        inconnues = set(valeurs) - set(self._colonnes)
+        if inconnues:
+            raise KeyError(f"Colonnes inconnues : {sorted(inconnues)}")
+
+        self._reserver(self._n + 1)
+        i = self._n
+        self._dates[i] = ns
+        for nom, colonne in self._colonnes.items():
+            colonne[i] = valeurs[nom] if nom in valeurs else _vide(colonne.dtype)
+        self._n += 1
+
+    def extend(self, autres):
+        """Ajoute en fin toutes les barres d'un autre Bars ou d'un DataFrame."""
+        if isinstance(autres, pd.DataFrame):
+            autres = Bars.from_pandas(autres)
+        if not len(autres):
+            return
+        dates = autres._dates[:autres._n]
+        if autres._tz != self._tz and self._n:
+            raise ValueError("Fuseaux horaires différents.")
+        if self._n and dates[0] < self._dernier_ns():
+            raise ValueError("Barres antérieures à la dernière barre.")
+        inconnues = set(autres._colonnes) - set(self._colonnes)
+        if self._n == 0 and not self._colonnes:
+            self._tz = autres._tz
+            inconnues = set()
+            for nom, colonne in autres._colonnes.items():
+                self._colonnes[nom] = np.empty(len(self._dates), dtype=colonne.dtype)
+        if inconnues:
+            raise KeyError(f"Colonnes inconnues : {sorted(inconnues)}")
+
+        debut, fin = self._n, self._n + len(dates)
+        self._reserver(fin)
+        self._dates[debut:fin] = dates
+        for nom, colonne in self._colonnes.items():
+            colonne[debut:fin] = autres._colonnes[nom][:autres._n] if nom in autres._colonnes \
+                else _vide(colonne.dtype)
+        self._n = fin
+
+    # --- Pickle (st.cache_*, multiprocessing) : seulement les barres utiles -----
+
+    def __getstate__(self):
+        return {'dates': self._dates[:self._n], 'colonnes': dict(self._vues()), 'tz': self._tz}
+
+    def __setstate__(self, etat):
+        self._dates = etat['dates']
+        self._n = len(etat['dates'])
+        self._tz = etat['tz']
+        self._colonnes = etat['colonnes']
+
+
+def _en_ns(date, tz):
+    """Date (Timestamp, datetime, chaîne, datetime64) → entier ns comparable à Bars._dates."""
+    horodatage = date if isinstance(date, pd.Timestamp) else pd.Timestamp(date)
+    if horodatage.tzinfo is None:
+        # .value : toujours en ns (UTC pour un Timestamp avec fuseau)
+        return horodatage.tz_localize(tz).value if tz is not None else horodatage.value
+    return horodatage.value if tz is not None else horodatage.tz_localize(None).value
+
+
+def _vide(dtype):
+    return np.nan if dtype.kind in 'fc' else np.zeros((), dtype=dtype)[()]
+
+
+# ============================================================================
+# ZONE DE TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    print("🧪 TEST BARRES.PY")
+    print("=" * 60)
+
+    n = 1_000_000
+    dates = pd.date_range("2000-01-01", periods=n, freq="min", name="Date")
+    prix = 2000 + np.cumsum(np.random.normal(0, 1, n))
+    df = pd.DataFrame({'Open': prix, 'High': prix + 1, 'Low': prix - 1,
+                       'Close': prix, 'Volume': 1000.0}, index=dates)
+
+    t = time.perf_counter()
+    bars = Bars.from_pandas(df)
+    print(f"  from_pandas ({n} barres) : {(time.perf_counter() - t) * 1e3:.2f} ms, "
+          f"mémoire partagée : {np.shares_memory(bars['Close'], df['Close'].to_numpy())}")
+
+    vue = bars[1000:2000]
+    print(f"  vue [1000:2000] partage la mémoire : {np.shares_memory(vue['High'], bars['High'])}")
+
+    t = time.perf_counter()
+    flux = Bars.from_pandas(df.iloc[:0])
+    for date, o, h, l, c, v in zip(dates[:100_000], prix, prix + 1, prix - 1, prix, prix):
+        flux.append(date, Open=o, High=h, Low=l, Close=c, Volume=v)
+    print(f"  append 100k barres : {(time.perf_counter() - t) * 1e3:.0f} ms")
+
+    t = time.perf_counter()
+    retour = bars.to_pandas()
+    print(f"  to_pandas : {(time.perf_counter() - t) * 1e3:.2f} ms, identique : {retour.equals(df)}")
@@ -0,0 +1,788 @@
+# cli.py - Interface en ligne de commande (mode "headless", sans Streamlit)
+#
+# Exemples :
+#   python cli.py fetch GC=F -o or.csv
+#   python cli.py backtest --csv or.csv --lookback 50
+#   python cli.py sweep GC=F --lookbacks 30,50,80 --stop-losses 1,2,3
+#   python cli.py startup -- backtest --csv or.csv   (démarrage à froid)
+#
+# Les modules lourds (pandas, yfinance, openai, plotly) ne sont
+# importés QUE dans les sous-commandes qui en ont besoin : un backtest sur un
+# CSV local ne charge ni yfinance, ni openai, ni plotly.
+# Les sorties (JSON / CSV) vont sur stdout, les messages sur stderr.
+
+import argparse
+import contextlib
+import itertools
+import json
+import sys
+import time
+
+
+# ============================================================================
+# 1️⃣ OUTILS COMMUNS
+# ============================================================================
+
+def _charger_donnees(args, bars=False):
+    """
+    Charge les OHLCV depuis un CSV local (--csv), le store de barres (--bars),
+    le serveur de données (--shared) ou Yahoo.
+
+    Avec --shared et bars=True, renvoie le barres.Bars publié (vues sans copie,
+    indicateurs inclus) pour les commandes qui l'acceptent tel quel.
+    """
+    import pandas as pd
+
+    if args.csv:
+        return pd.read_csv(args.csv, index_col=0, parse_dates=True)
+
+    if not args.ticker:
+        raise SystemExit("❌ Il faut un ticker ou --csv FICHIER.")
+
+    if args.shared:
+        from partage import attach
+        try:
+            partagees = attach(args.ticker, interval=args.interval)
+        except FileNotFoundError:
+            raise SystemExit(f"❌ {args.ticker} n'est pas publié (lancer 'cli.py serve {args.ticker}').")
+        return partagees if bars else partagees.to_pandas()
+
+    if args.bars:
+        from stockage import BarStore
+        return BarStore(args.bars).read(args.ticker, interval=args.interval)
+
+    from donnees import get_market_data
+    # get_market_data affiche une bannière : on la renvoie sur stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        return get_market_data(args.ticker, period=args.period, interval=args.interval)
+
+
+def _avec_indicateurs(df):
+    """Ajoute RSI/MACD si le fichier ne les contient pas déjà."""
+    if 'RSI' in df.columns:
+        return df
+    from donnees import add_indicators
+    return add_indicators(df)
+
+
+def _ecrire_dataframe(df, args):
+    """Écrit un DataFrame en CSV ou JSON, sur stdout ou dans --output."""
+    if args.format == 'json':
+        texte = df.to_json(orient='split', date_format='iso')
+    else:
+        texte = df.to_csv()
+    _ecrire_texte(texte, args.output)
+
+
+def _ecrire_json(obj, args):
+    _ecrire_texte(json.dumps(obj, default=str, ensure_ascii=False), args.output)
+
+
+def _ecrire_texte(texte, chemin):
+    if chemin:
+        with open(chemin, 'w', encoding='utf-8') as f:
+            f.write(texte)
+    else:
+        sys.stdout.write(texte)
+        if not texte.endswith('\n'):
+            sys.stdout.write('\n')
+
+
+def _liste(type_):
+    """Convertit '30,50,80' en [30, 50, 80]."""
+    def convertir(texte):
+        return [type_(x) for x in texte.split(',') if x.strip()]
+    return convertir
+
+
+def _backtester(df, args, lookback):
+    """Génère les signaux d'un FibonacciBacktester pour une fenêtre donnée."""
+    from functools import partial
+    from donnees import calculate_fibonacci
+    from backtest import FibonacciBacktester
+
+    tester = FibonacciBacktester(df, initial_capital=args.capital)
+    tester.generate_signals(partial(calculate_fibonacci, lookback=lookback), lookback=lookback)
+    return tester
+
+
+# ============================================================================
+# 2️⃣ SOUS-COMMANDES
+# ============================================================================
+
+def cmd_fetch(args):
+    _ecrire_dataframe(_charger_donnees(args), args)
+
+
+def cmd_indicators(args):
+    df = _avec_indicateurs(_charger_donnees(args))
+    _ecrire_dataframe(df, args)
+
+
+def cmd_signals(args):
+    df = _avec_indicateurs(_charger_donnees(args))
+    tester = _backtester(df, args, args.lookback)
+    _ecrire_dataframe(tester.df, args)
+
+
+def _params(args, lookback, stop_loss, take_profit):
+    return {'lookback': lookback, 'stop_loss_pct': stop_loss,
+            'take_profit_pct': take_profit, 'initial_capital': args.capital}
+
+
+def cmd_backtest(args):
+    if args.model and (args.checkpoint or args.stream or args.store):
+        raise SystemExit("❌ --model ne se combine pas avec --checkpoint, --stream ou --store.")
+    if args.checkpoint:
+        return _backtest_incremental(args)
+    if args.stream:
+        return _backtest_progressif(args)
+
+    df = _avec_indicateurs(_charger_donnees(args, bars=not args.store))
+
+    if args.store:
+        from resultats import ResultStore
+        store = ResultStore(args.store)
+        run_id, metrics, cached = store.run_or_load(
+            df, args.ticker, lookback=args.lookback, stop_loss_pct=args.stop_loss,
+            take_profit_pct=args.take_profit, initial_capital=args.capital)
+        resultat = {'run_id': run_id, 'cached': cached, 'ticker': args.ticker,
+                    **_params(args, args.lookback, args.stop_loss, args.take_profit),
+                    'metrics': metrics}
+        if args.trades:
+            resultat['trades'] = store.load_trades(run_id).to_dict(orient='records')
+        store.close()
+        _ecrire_json(resultat, args)
+        return
+
+    lookback = args.lookback
+    if args.model:
+        from backtest import FibonacciBacktester
+        from modele import SignalModel
+        model = SignalModel.load(args.model)
+        lookback = model.lookback  # les signaux viennent du lookback du modèle, pas de --lookback
+        tester = FibonacciBacktester(df, initial_capital=args.capital)
+        tester.generate_model_signals(model, min_confidence=args.min_confidence)
+    else:
+        tester = _backtester(df, args, lookback)
+    tester.run_backtest(stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit)
+
+    resultat = {
+        'ticker': args.ticker,
+        **_params(args, lookback, args.stop_loss, args.take_profit),
+        **({'model': args.model, 'min_confidence': args.min_confidence} if args.model else {}),
+        'metrics': tester.get_metrics(),
+    }
+    if args.trades:
+        resultat['trades'] = tester.trades
+    _ecrire_json(resultat, args)
+
+
+def _backtest_incremental(args):
+    """Reprend le backtest depuis --checkpoint et ne traite que les nouvelles barres."""
+    import os
+    from backtest import StreamingBacktester
+
+    params = dict(initial_capital=args.capital, lookback=args.lookback,
+                  stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit)
+    if os.path.exists(args.checkpoint):
+        tester = StreamingBacktester.load(args.checkpoint)
+        differents = {k for k, v in params.items() if getattr(tester, k) != v}
+        if differents:
+            raise SystemExit(f"❌ {args.checkpoint} a été créé avec d'autres paramètres "
+                             f"({', '.join(sorted(differents))}).")
+    else:
+        tester = StreamingBacktester(**params)
+
+    # Pas besoin des indicateurs : le backtester incrémental les calcule lui-même
+    df = _charger_donnees(args, bars=True)
+    deja = tester.index
+    tester.process(df)
+    tester.save(args.checkpoint)
+
+    resultat = {
+        'ticker': args.ticker,
+        **_params(args, args.lookback, args.stop_loss, args.take_profit),
+        'bars_total': tester.index,
+        'bars_new': tester.index - deja,
+        'metrics': tester.get_metrics(),
+    }
+    if args.trades:
+        resultat['trades'] = tester.trades  # trades fermés pendant cet appel
+    _ecrire_json(resultat, args)
+
+
+def _backtest_progressif(args):
+    """Un événement JSON par ligne (NDJSON) toutes les --stream barres, puis le résultat final."""
+    from backtest import iter_backtest
+
+    df = _charger_donnees(args, bars=True)
+    sortie = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for evenement in iter_backtest(df, initial_capital=args.capital, lookback=args.lookback,
+                                       stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit,
+                                       every=args.stream):
+            if evenement['type'] == 'equity':
+                evenement = {'type': 'equity', 'start': evenement['start'], 'stop': evenement['stop'],
+                             'dates': [str(d) for d in evenement['dates']],
+                             'portfolio': evenement['portfolio'].tolist()}
+            elif evenement['type'] == 'done':
+                evenement = {'type': 'done', 'ticker': args.ticker,
+                             **_params(args, args.lookback, args.stop_loss, args.take_profit),
+                             'metrics': evenement['metrics'], 'seconds': round(evenement['seconds'], 3),
+                             **({'trades': evenement['trades']} if args.trades else {})}
+            sortie.write(json.dumps(evenement, default=str, ensure_ascii=False) + "\n")
+            sortie.flush()
+    except BrokenPipeError:
+        if sortie is not sys.stdout:
+            raise
+        # Lecteur parti (ex : | head) : stdout → /dev/null pour que la fermeture de
+        # Python n'écrive pas de seconde erreur, puis sortie silencieuse
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise SystemExit(1)
+    finally:
+        if sortie is not sys.stdout:
+            sortie.close()
+
+
+def cmd_sweep(args):
+    """Grille lookback × stop loss × take profit (les signaux ne dépendent que du lookback)."""
+    from backtest import FibonacciBacktester
+
+    df = _avec_indicateurs(_charger_donnees(args))
+
+    store = None
+    if args.store:
+        from resultats import ResultStore, STRATEGY_VERSION, data_hash, run_key
+        store = ResultStore(args.store)
+        version = data_hash(df)
+
+    lignes = []
+    for lookback in args.lookbacks:
+        signaux = None
+        for sl, tp in itertools.product(args.stop_losses, args.take_profits):
+            params = _params(args, lookback, sl, tp)
+
+            # Run déjà présent dans le store : pas de recalcul
+            if store is not None:
+                run_id = run_key(args.ticker, version, STRATEGY_VERSION, params)
+                metrics = store.metrics(run_id)
+                if metrics is not None:
+                    lignes.append({'run_id': run_id, 'cached': True, **params, **metrics})
+                    continue
+
+            if signaux is None:
+                signaux = _backtester(df, args, lookback).df
+            tester = FibonacciBacktester(signaux, initial_capital=args.capital)
+            tester.run_backtest(stop_loss_pct=sl, take_profit_pct=tp)
+            metrics = tester.get_metrics()
+
+            ligne = {**params, **metrics}
+            if store is not None:
+                store.save(run_id, args.ticker, version, params, metrics, tester.trades, tester.df)
+                ligne = {'run_id': run_id, 'cached': False, **ligne}
+            lignes.append(ligne)
+
+    if store is not None:
+        store.close()
+
+    if args.format == 'json':
+        _ecrire_json(lignes, args)
+    else:
+        import pandas as pd
+        _ecrire_texte(pd.DataFrame(lignes).to_csv(index=False), args.output)
+
+
+def cmd_runs(args):
+    """Requête sur le store : meilleurs runs selon une métrique."""
+    from resultats import ResultStore
+
+    ranges = {}
+    if args.lookback_min is not None or args.lookback_max is not None:
+        ranges['lookback'] = (args.lookback_min if args.lookback_min is not None else 0,
+                              args.lookback_max if args.lookback_max is not None else 10**9)
+
+    store = ResultStore(args.store)
+    runs = store.top(args.metric, ticker=args.ticker, limit=args.limit, **ranges)
+    store.close()
+
+    if args.format == 'json':
+        _ecrire_texte(runs.to_json(orient='records'), args.output)
+    else:
+        _ecrire_texte(runs.to_csv(index=False), args.output)
+
+
+def cmd_ingest(args):
+    """Téléchargement parallèle d'un univers vers le store de barres."""
+    from ingestion import FixtureSource, RecordingSource, YahooSource, ingest_universe
+    from stockage import BarStore
+
+    tickers = _tickers(args)
+    if args.replay:
+        source = FixtureSource(args.replay, interval=args.interval)
+    else:
+        source = YahooSource(period=args.period, interval=args.interval)
+        if args.record:
+            source = RecordingSource(source, args.record)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        resume = ingest_universe(tickers, source=source, store=BarStore(args.bars),
+                                 workers=args.workers, rate=args.rate, retries=args.retries,
+                                 backoff=args.backoff, append=args.append)
+    _ecrire_json(resume, args)
+
+
+def cmd_import(args):
+    """Import en masse d'archives CSV / Parquet vers le store de barres."""
+    from importation import import_bars
+    from stockage import BarStore
+
+    # 'px_last=Close,Time=' : 'Time' vide → colonne ignorée
+    colonnes = {nom: standard or None for nom, standard in
+                (paire.split('=', 1) for paire in args.columns)} if args.columns else None
+    resume = import_bars(args.files, store=BarStore(args.bars), ticker=args.ticker,
+                         interval=args.interval, append=args.append, columns=colonnes,
+                         date_unit=args.date_unit, tz=args.tz, to_tz=args.to_tz, dtype=args.dtype,
+                         delimiter=args.delimiter, workers=args.workers,
+                         allow_close_only=args.allow_close_only)
+    for ticker, rapport in resume['tickers'].items():
+        for alerte in rapport.get('warnings', []):
+            print(f"⚠️ {ticker} : {alerte}", file=sys.stderr)
+    print(f"📥 {resume['rows_read']:,} lignes en {resume['seconds']:.2f} s "
+          f"({resume['rows_per_s']:,} lignes/s)", file=sys.stderr)
+    _ecrire_json(resume, args)
+
+
+def _tickers(args):
+    """Tickers passés en arguments + ceux du fichier --file (un par ligne, # = commentaire)."""
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            tickers += [ligne.strip() for ligne in f if ligne.strip() and not ligne.startswith('#')]
+    if not tickers:
+        raise SystemExit("❌ Aucun ticker (arguments ou --file).")
+    return tickers
+
+
+def cmd_pipeline(args):
+    """Traitement de nuit : graphe d'étapes par ticker, étapes inchangées sautées."""
+    from ingestion import FixtureSource, StoreSource, YahooSource
+    from pipeline import print_pipeline_summary, run_pipeline
+
+    if args.replay:
+        source = FixtureSource(args.replay, interval=args.interval)
+    elif args.bars:
+        from stockage import BarStore
+        source = StoreSource(BarStore(args.bars), interval=args.interval)
+    else:
+        source = YahooSource(period=args.period, interval=args.interval)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        resume = run_pipeline(_tickers(args), root=args.root, source=source, workers=args.workers,
+                              rate=args.rate, retries=args.retries, backoff=args.backoff,
+                              stages=args.stages, force=args.force, period=args.period,
+                              interval=args.interval, lookback=args.lookback,
+                              stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit,
+                              initial_capital=args.capital)
+        print_pipeline_summary(resume)
+    _ecrire_json(resume, args)
+
+
+def cmd_serve(args):
+    """Serveur de données : publie les barres en mémoire partagée et les rafraîchit."""
+    from ingestion import FixtureSource, StoreSource, YahooSource
+    from partage import DOSSIER_PARTAGE, serve_market_data
+
+    if args.replay:
+        source = FixtureSource(args.replay, interval=args.interval)
+    elif args.bars:
+        from stockage import BarStore
+        source = StoreSource(BarStore(args.bars), interval=args.interval)
+    else:
+        source = YahooSource(period=args.period, interval=args.interval)
+
+    tickers = _tickers(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        print(f"📡 Serveur de données : {len(tickers)} tickers, rafraîchissement toutes les "
+              f"{args.refresh:g} s (Ctrl+C pour arrêter)")
+        versions = serve_market_data(tickers, source, interval=args.interval,
+                                     root=args.root or DOSSIER_PARTAGE, refresh=args.refresh,
+                                     iterations=args.iterations)
+    _ecrire_json({ticker: version for (ticker, _), version in versions.items()}, args)
+
+
+def _adresse(texte):
+    """'/tmp/flux.sock' → socket Unix ; 'hote:port' → TCP."""
+    if ':' in texte and not texte.startswith('/'):
+        hote, port = texte.rsplit(':', 1)
+        return (hote, int(port))
+    return texte
+
+
+def cmd_feed(args):
+    """Serveur de flux local (barres stockées ou synthétiques)."""
+    import asyncio
+    from simulateur import bars_from_store, serve_feed, synthetic_bars
+
+    if args.tickers:
+        from stockage import BarStore
+        symbols, barres = bars_from_store(BarStore(args.bars), args.tickers, interval=args.interval)
+    else:
+        symbols, barres = synthetic_bars(args.symbols, args.n_bars)
+
+    print(f"📡 Flux de {len(barres)} barres ({len(symbols)} symboles) sur {args.address} "
+          f"à {args.rate or 'max'} barres/s", file=sys.stderr)
+    try:
+        asyncio.run(serve_feed(_adresse(args.address), symbols, barres, rate=args.rate))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_loadtest(args):
+    """Test de charge : latences et débit de la chaîne temps réel."""
+    from simulateur import run_load_test
+
+    with contextlib.redirect_stdout(sys.stderr):
+        resultat = run_load_test(rates=args.rates, n_symbols=args.symbols, seconds=args.seconds,
+                                 max_p99_ms=args.max_p99_ms)
+    _ecrire_json(resultat, args)
+
+
+def cmd_analyze(args):
+    from donnees import calculate_fibonacci
+
+    df = _avec_indicateurs(_charger_donnees(args))
+
+    if args.model:
+        # Le modèle local décide si l'appel à l'IA vaut la peine ; Fibonacci sur
+        # le même lookback que celui du modèle (comme le prompt envoyé à l'IA)
+        from modele import SignalModel
+        model = SignalModel.load(args.model)
+        fibs, high, low, trend = calculate_fibonacci(df, lookback=model.lookback)
+        with contextlib.redirect_stdout(sys.stderr):
+            from intelligence import generate_ai_analysis_prefiltered
+            resultat = generate_ai_analysis_prefiltered(
+                df, model, market=args.market or args.ticker or 'OR',
+                min_confidence=args.min_confidence)
+        resultat['lookback'] = model.lookback
+        resultat['trend'] = trend
+        resultat['fib_levels'] = fibs
+        _ecrire_json(resultat, args)
+        return
+
+    fibs, high, low, trend = calculate_fibonacci(df, lookback=args.lookback)
+
+    # intelligence.py peut afficher un avertissement : on le garde sur stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        from intelligence import generate_ai_analysis
+        resultat = generate_ai_analysis(
+            price=df['Close'].iloc[-1],
+            rsi=df['RSI'].iloc[-1],
+            macd_line=df['MACD_12_26_9'].iloc[-1],
+            macd_signal=df['MACDs_12_26_9'].iloc[-1],
+            fib_levels=fibs,
+            trend=trend,
+            market=args.market or args.ticker or 'OR'
+        )
+    resultat['trend'] = trend
+    resultat['fib_levels'] = fibs
+    _ecrire_json(resultat, args)
+
+
+def cmd_train(args):
+    from modele import train_signal_model
+
+    df = _avec_indicateurs(_charger_donnees(args))
+    model, rapport = train_signal_model(df, lookback=args.lookback, horizon=args.horizon,
+                                        threshold_pct=args.threshold, test_size=args.test_size)
+    model.save(args.save)
+    _ecrire_json({'ticker': args.ticker, 'model': args.save, 'lookback': args.lookback,
+                  'horizon': args.horizon, 'threshold_pct': args.threshold, **rapport}, args)
+
+
+def cmd_report(args):
+    if args.store:
+        # Rapport en lot : index + une page par run du store. -o est ici le DOSSIER
+        # du rapport ; le résumé JSON y est écrit (summary.json) et sur stdout
+        import os
+        from rapports import generate_batch_report
+        dossier = args.output or 'rapport'
+        resume = generate_batch_report(args.store, dossier, ticker=args.ticker,
+                                       metric=args.metric, limit=args.limit, workers=args.workers)
+        resume['summary'] = os.path.join(dossier, 'summary.json')
+        _ecrire_texte(json.dumps(resume), resume['summary'])
+        _ecrire_texte(json.dumps(resume), None)
+        return
+
+    from backtest import plot_backtest_results
+
+    df = _avec_indicateurs(_charger_donnees(args))
+    tester = _backtester(df, args, args.lookback)
+    tester.run_backtest(stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit)
+
+    fig = plot_backtest_results(tester.df, tester.trades, market=args.market or args.ticker or 'OR')
+    chemin = args.output or 'rapport_backtest.html'
+    fig.write_html(chemin)
+    json.dump({'report': chemin, 'metrics': tester.get_metrics()}, sys.stdout, default=str)
+    sys.stdout.write('\n')
+
+
+def cmd_startup(args):
+    """
+    Démarrage à froid d'une commande, mesuré de l'extérieur (sous-processus) :
+    interpréteur seul, commande complète, et imports les plus lents (python -X importtime).
+    """
+    import os
+    import statistics
+    import subprocess
+
+    commande = [os.path.abspath(__file__)] + [a for a in args.cible if a != '--']
+    if len(commande) == 1:
+        raise SystemExit("❌ Commande à mesurer manquante (ex : startup -- backtest --csv or.csv).")
+
+    def chrono(arguments):
+        debut = time.perf_counter()
+        code = subprocess.run([sys.executable] + arguments, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode
+        return time.perf_counter() - debut, code
+
+    interpreteur = statistics.median(chrono(['-c', 'pass'])[0] for _ in range(args.repeat))
+    mesures = [chrono(commande) for _ in range(args.repeat)]
+
+    def importations(arguments):
+        # Lignes "import time: self [us] | cumulative | module", imbrication = indentation
+        trace = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True).stderr
+        return {champs[2].strip(): int(champs[1]) / 1e6 for champs in
+                (ligne.split('|') for ligne in trace.splitlines())
+                if len(champs) == 3 and champs[1].strip().isdigit() and not champs[2].startswith('  ')}
+
+    # Imports déjà faits par l'interpréteur seul (site, encodings...) : comptés dans interpreteur_s
+    deja = importations(['-c', 'pass'])
+    imports = {m: t for m, t in importations(commande).items() if m not in deja}
+
+    total = statistics.median(t for t, _ in mesures)
+    _ecrire_json({
+        'commande': commande[1:],
+        'code_retour': mesures[-1][1],
+        'total_s': round(total, 4),
+        'interpreteur_s': round(interpreteur, 4),
+        'imports_s': round(sum(imports.values()), 4),
+        'imports_lents': {m: round(t, 4) for m, t in
+                          sorted(imports.items(), key=lambda x: -x[1])[:args.top]},
+    }, args)
+
+
+# ============================================================================
+# 3️⃣ PARSEUR
+# ============================================================================
+
+def construire_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Robot Trading IA & Fibonacci - mode ligne de commande"
+    )
+    parser.add_argument('--timing', action='store_true',
+                        help="Affiche sur stderr le temps d'exécution de la commande et les modules "
+                             "lourds chargés (JSON) ; démarrage à froid : sous-commande startup")
+    sous = parser.add_subparsers(dest='commande', required=True)
+
+    # Options partagées : source des données + sortie
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument('ticker', nargs='?', help="Symbole Yahoo Finance (ex: GC=F)")
+    source.add_argument('--csv', help="Fichier CSV local (sortie de 'fetch') au lieu de Yahoo")
+    source.add_argument('--bars', help="Dossier du store de barres (rempli par 'ingest')")
+    source.add_argument('--shared', action='store_true',
+                        help="Barres publiées par 'serve' (mémoire partagée, sans copie)")
+    source.add_argument('--period', default='1y')
+    source.add_argument('--interval', default='1d')
+    source.add_argument('-o', '--output', help="Fichier de sortie (défaut : stdout)")
+    source.add_argument('--format', choices=['csv', 'json'], default='csv')
+
+    strategie = argparse.ArgumentParser(add_help=False)
+    strategie.add_argument('--lookback', type=int, default=50)
+    strategie.add_argument('--capital', type=float, default=10000)
+
+    stockage = argparse.ArgumentParser(add_help=False)
+    stockage.add_argument('--store', help="Dossier du store de résultats (SQLite + Parquet)")
+
+    gestion = argparse.ArgumentParser(add_help=False)
+    gestion.add_argument('--stop-loss', type=float, default=2.0)
+    gestion.add_argument('--take-profit', type=float, default=5.0)
+
+    p = sous.add_parser('fetch', parents=[source], help="Télécharge les OHLCV")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sous.add_parser('indicators', parents=[source], help="Ajoute RSI et MACD")
+    p.set_defaults(func=cmd_indicators)
+
+    p = sous.add_parser('signals', parents=[source, strategie], help="Calcule la colonne SIGNAL")
+    p.set_defaults(func=cmd_signals)
+
+    modele = argparse.ArgumentParser(add_help=False)
+    modele.add_argument('--model', metavar='FICHIER',
+                        help="Modèle local (python cli.py train) comme source de signaux / préfiltre IA "
+                             "(son lookback remplace --lookback)")
+    modele.add_argument('--min-confidence', type=float, default=0.5,
+                        help="Probabilité minimale d'ACHAT / VENTE pour le modèle")
+
+    p = sous.add_parser('backtest', parents=[source, strategie, gestion, stockage, modele],
+                        help="Lance un backtest (métriques en JSON)")
+    p.add_argument('--trades', action='store_true', help="Inclut la liste des trades")
+    p.add_argument('--checkpoint', metavar='FICHIER',
+                   help="Reprend depuis ce snapshot JSON et ne traite que les nouvelles barres")
+    p.add_argument('--stream', type=int, metavar='N',
+                   help="Sortie progressive NDJSON : equity, métriques et trades toutes les N barres")
+    p.set_defaults(func=cmd_backtest)
+
+    p = sous.add_parser('sweep', parents=[source, strategie, stockage], help="Grille de paramètres")
+    p.add_argument('--lookbacks', type=_liste(int), default=[30, 50, 80])
+    p.add_argument('--stop-losses', type=_liste(float), default=[1.0, 2.0, 3.0])
+    p.add_argument('--take-profits', type=_liste(float), default=[3.0, 5.0, 8.0])
+    p.set_defaults(func=cmd_sweep)
+
+    p = sous.add_parser('runs', help="Interroge le store de résultats")
+    p.add_argument('--store', default='resultats')
+    p.add_argument('--ticker')
+    p.add_argument('--metric', default='sharpe_ratio')
+    p.add_argument('--lookback-min', type=int)
+    p.add_argument('--lookback-max', type=int)
+    p.add_argument('--limit', type=int, default=20)
+    p.add_argument('-o', '--output')
+    p.add_argument('--format', choices=['csv', 'json'], default='csv')
+    p.set_defaults(func=cmd_runs)
+
+    p = sous.add_parser('ingest', help="Télécharge un univers de tickers en parallèle")
+    p.add_argument('tickers', nargs='*')
+    p.add_argument('--file', help="Fichier texte : un ticker par ligne")
+    p.add_argument('--bars', default='donnees_marche', help="Dossier du store de barres")
+    p.add_argument('--period', default='1y')
+    p.add_argument('--interval', default='1d')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--rate', type=float, default=5.0, help="Requêtes par seconde maximum")
+    p.add_argument('--retries', type=int, default=3)
+    p.add_argument('--backoff', type=float, default=1.0, help="Attente initiale (s) entre deux essais")
+    p.add_argument('--append', action='store_true', help="Fusionne avec les barres déjà stockées")
+    p.add_argument('--record', help="Enregistre les réponses brutes dans ce dossier")
+    p.add_argument('--replay', help="Rejoue les réponses enregistrées (sans réseau)")
+    p.add_argument('-o', '--output')
+    p.set_defaults(func=cmd_ingest)
+
+    p = sous.add_parser('import', help="Importe des archives CSV / Parquet dans le store de barres")
+    p.add_argument('files', nargs='+', help="Fichiers .csv ou .parquet")
+    p.add_argument('--bars', default='donnees_marche', help="Dossier du store de barres")
+    p.add_argument('--ticker', help="Symbole (défaut : colonne Symbol/Ticker, sinon nom du fichier)")
+    p.add_argument('--interval', help="Intervalle du store (défaut : déduit des dates, ex : 1m, 1d)")
+    p.add_argument('--columns', type=_liste(str), help="Noms du fournisseur, ex : px_last=Close,ts=Date,Time= (ignorée)")
+    p.add_argument('--date-unit', choices=['s', 'ms', 'us', 'ns'], help="Dates en entiers (epoch)")
+    p.add_argument('--tz', help="Fuseau des dates naïves du fichier (ex : America/New_York)")
+    p.add_argument('--to-tz', help="Fuseau des dates stockées (ex : UTC ; demande --tz si dates naïves)")
+    p.add_argument('--allow-close-only', action='store_true',
+                   help="Accepte un fichier sans Open / High / Low (colonnes manquantes listées)")
+    p.add_argument('--dtype', choices=['float64', 'float32'], default='float64')
+    p.add_argument('--delimiter', default=',')
+    p.add_argument('--workers', type=int, help="Threads d'analyse (défaut : nombre de CPU)")
+    p.add_argument('--append', action='store_true', help="Fusionne avec les barres déjà stockées")
+    p.add_argument('-o', '--output', help="Rapport JSON (défaut : stdout)")
+    p.set_defaults(func=cmd_import)
+
+    p = sous.add_parser('pipeline', parents=[strategie, gestion],
+                        help="Traitement de nuit (download → indicateurs → IA / backtest → graphique)")
+    p.add_argument('tickers', nargs='*')
+    p.add_argument('--file', help="Fichier texte : un ticker par ligne")
+    p.add_argument('--root', default='pipeline', help="Dossier du cache des étapes")
+    p.add_argument('--bars', help="Lit les barres dans ce store au lieu de Yahoo")
+    p.add_argument('--replay', help="Rejoue les réponses enregistrées par 'ingest --record'")
+    p.add_argument('--period', default='1y')
+    p.add_argument('--interval', default='1d')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--rate', type=float, default=5.0, help="Téléchargements par seconde maximum")
+    p.add_argument('--retries', type=int, default=3)
+    p.add_argument('--backoff', type=float, default=1.0, help="Attente initiale (s) entre deux essais")
+    p.add_argument('--stages', type=_liste(str), help="Étapes voulues, ex : backtest,plot (+ dépendances)")
+    p.add_argument('--force', action='store_true', help="Recalcule même les étapes inchangées")
+    p.add_argument('-o', '--output', help="Résumé JSON (défaut : stdout)")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sous.add_parser('serve', help="Serveur de données en mémoire partagée (app et CLI --shared)")
+    p.add_argument('tickers', nargs='*')
+    p.add_argument('--file', help="Fichier texte : un ticker par ligne")
+    p.add_argument('--bars', help="Lit les barres dans ce store au lieu de Yahoo")
+    p.add_argument('--replay', help="Rejoue les réponses enregistrées par 'ingest --record'")
+    p.add_argument('--period', default='1y')
+    p.add_argument('--interval', default='1d')
+    p.add_argument('--refresh', type=float, default=60.0, help="Secondes entre deux rechargements")
+    p.add_argument('--iterations', type=int, help="Nombre de passes (défaut : jusqu'à Ctrl+C)")
+    p.add_argument('--root', help="Dossier des manifestes (défaut : $ROBOT_TRADING_PARTAGE ou dossier temporaire)")
+    p.add_argument('-o', '--output')
+    p.set_defaults(func=cmd_serve)
+
+    p = sous.add_parser('feed', help="Serveur de flux de barres local (socket Unix ou TCP)")
+    p.add_argument('tickers', nargs='*', help="Tickers du store (sinon barres synthétiques)")
+    p.add_argument('--address', default='/tmp/robot_trading_flux.sock', help="Chemin de socket ou hote:port")
+    p.add_argument('--bars', default='donnees_marche')
+    p.add_argument('--interval', default='1d')
+    p.add_argument('--rate', type=float, default=10_000, help="Barres par seconde (0 = max)")
+    p.add_argument('--symbols', type=int, default=50, help="Symboles synthétiques")
+    p.add_argument('--n-bars', type=int, default=10_000, help="Barres synthétiques par symbole")
+    p.set_defaults(func=cmd_feed)
+
+    p = sous.add_parser('loadtest', help="Test de charge de la chaîne indicateurs → signal → simulation")
+    p.add_argument('--rates', type=_liste(int), default=[1_000, 5_000, 10_000, 20_000, 50_000, 0])
+    p.add_argument('--symbols', type=int, default=50)
+    p.add_argument('--seconds', type=float, default=3.0, help="Durée de chaque palier")
+    p.add_argument('--max-p99-ms', type=float, default=50.0)
+    p.add_argument('-o', '--output')
+    p.set_defaults(func=cmd_loadtest)
+
+    p = sous.add_parser('analyze', parents=[source, strategie, modele], help="Analyse IA (JSON)")
+    p.add_argument('--market', help="Nom du marché affiché dans le prompt")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sous.add_parser('train', parents=[source, strategie],
+                        help="Entraîne le modèle de signal local (régression logistique)")
+    p.add_argument('--save', default='modele.json', metavar='FICHIER', help="Modèle entraîné (JSON)")
+    p.add_argument('--horizon', type=int, default=5, help="Barres à venir pour l'étiquette")
+    p.add_argument('--threshold', type=float, default=1.0,
+                   help="Rendement futur (%%) au-delà duquel une barre est ACHAT / VENTE")
+    p.add_argument('--test-size', type=float, default=0.3,
+                   help="Part finale de l'historique gardée pour l'évaluation")
+    p.set_defaults(func=cmd_train)
+
+    aide = ("Backtest + graphique HTML (-o : fichier .html), ou rapport en lot "
+            "avec --store (-o : dossier, défaut rapport/, résumé dans summary.json)")
+    p = sous.add_parser('report', parents=[source, strategie, gestion, stockage], help=aide, description=aide)
+    p.add_argument('--market', help="Nom du marché affiché sur le graphique")
+    p.add_argument('--metric', default='sharpe_ratio', help="Avec --store : tri des runs")
+    p.add_argument('--limit', type=int, default=1000, help="Avec --store : nombre de runs")
+    p.add_argument('--workers', type=int, help="Avec --store : processus de rendu")
+    p.set_defaults(func=cmd_report)
+
+    p = sous.add_parser('startup', help="Mesure le démarrage à froid d'une commande (sous-processus)")
+    p.add_argument('cible', nargs=argparse.REMAINDER, help="Commande à mesurer, après --")
+    p.add_argument('--repeat', type=int, default=5, help="Lancements (médiane)")
+    p.add_argument('--top', type=int, default=10, help="Nombre d'imports détaillés")
+    p.add_argument('-o', '--output')
+    p.set_defaults(func=cmd_startup)
+
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    t_debut = time.perf_counter()
+    args.func(args)
+    if args.timing:
+        # Temps dans le processus (imports paresseux inclus) ; l'interpréteur et les
+        # imports du module sont mesurés de l'extérieur par 'startup'
+        print(json.dumps({
+            'commande': args.commande,
+            'execution_s': round(time.perf_counter() - t_debut, 4),
+            'modules_charges': sorted(m for m in ('pandas', 'yfinance', 'openai', 'plotly')
+                                      if m in sys.modules),
+        }), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,67 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+
+from indicateurs import rsi, macd
+
+# yfinance est lourd à importer : on ne le charge que dans la fonction qui en a
+# besoin (la CLI l'évite pour un simple backtest sur CSV).
 
 def get_market_data(ticker, period="1y", interval="1d"):
     """Récupère les données de l'OR (GC=F)"""
+    import yfinance as yf
     print(f"--- Téléchargement des données pour {ticker} ---")
     df = yf.download(ticker, period=period, interval=interval)
     df = df.dropna()
     # Correction pour éviter les erreurs de format Yahoo Finance
+    return normalize_ohlcv(df, ticker)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def normalize_ohlcv(df, ticker=None):
+    """Remet un téléchargement Yahoo au format simple : colonnes OHLCV, index 'Date'"""
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.droplevel(1)
+        # yf.download renvoie (Price, Ticker) : on garde le niveau des prix
+        niveau = next((i for i, valeurs in enumerate(df.columns.levels) if ticker in valeurs), None)
+        if ticker is not None and niveau is not None:
+            df = df.xs(ticker, axis=1, level=niveau)
+        else:
+            df.columns = df.columns.droplevel(1)
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+    df.columns.name = None
+    df.index = pd.DatetimeIndex(df.index, name='Date')
     return df
 
-def add_indicators(df):
-    """Ajoute RSI et MACD"""
-    df['RSI'] = ta.rsi(df['Close'], length=14)
-    macd = ta.macd(df['Close'])
-    df = pd.concat([df, macd], axis=1)
+def add_indicators(df, dtype=None):
+    """Ajoute RSI et MACD (mêmes colonnes que pandas_ta, calculées par indicateurs.py).
+    Accepte un DataFrame ou un barres.Bars."""
+    close = np.asarray(df['Close'])
+    df['RSI'] = rsi(close, length=14, dtype=dtype)
+    # Colonnes ajoutées en place : pas de pd.concat qui recopie tout le DataFrame
+    ligne, hist, signal = macd(close, 12, 26, 9, dtype=dtype)
+    df['MACD_12_26_9'] = ligne
+    df['MACDh_12_26_9'] = hist
+    df['MACDs_12_26_9'] = signal
     return df
 
 def calculate_fibonacci(df, lookback=50):
-    """Calcule Fibonacci sur les 50 derniers jours"""
+    """Calcule Fibonacci sur les 50 derniers jours (DataFrame ou barres.Bars)"""
     recent_data = df.tail(lookback)
-    high_price = recent_data['High'].max()
-    low_price = recent_data['Low'].min()
+    highs = np.asarray(recent_data['High'])
+    lows = np.asarray(recent_data['Low'])
+    i_high = np.nanargmax(highs)
+    i_low = np.nanargmin(lows)
+    high_price = highs[i_high]
+    low_price = lows[i_low]
     
     # On trouve la tendance
-    date_high = recent_data['High'].idxmax()
-    date_low = recent_data['Low'].idxmin()
-    trend = 'down' if date_high > date_low else 'up'
+    dates = recent_data.index
+    trend = 'down' if dates[i_high] > dates[i_low] else 'up'
     
+    levels = fibonacci_levels(high_price, low_price, trend)
+    return levels, high_price, low_price, trend
+
+def fibonacci_levels(high_price, low_price, trend):
+    """Niveaux de retracement entre un plus haut et un plus bas"""
     diff = high_price - low_price
     levels = {}
     ratios = [0.236, 0.382, 0.5, 0.618, 1.0, 1.618]
@@ -41,7 +73,43 @@ def calculate_fibonacci(df, lookback=50):
         for r in ratios:
             levels[f"{r*100}%"] = low_price + (diff * r)
             
-    return levels, high_price, low_price, trend
+    return levels
+
+FIB_RATIOS = {'FIB_236': 0.236, 'FIB_382': 0.382, 'FIB_500': 0.5,
+              'FIB_618': 0.618, 'FIB_1000': 1.0, 'FIB_1618': 1.618}
+
+def add_fibonacci(df, lookback=50):
+    """
+    Ajoute, pour chaque barre, les niveaux de calculate_fibonacci sur les
+    `lookback` barres qui se terminent à celle-ci : colonnes FIB_HIGH, FIB_LOW,
+    FIB_TREND (1 = up, -1 = down) et FIB_236 ... FIB_1618 (NaN avant `lookback` barres).
+    """
+    highs = np.asarray(df['High'], dtype=np.float64)
+    lows = np.asarray(df['Low'], dtype=np.float64)
+    n = len(highs)
+    fib_high = np.full(n, np.nan)
+    fib_low = np.full(n, np.nan)
+    tendance = np.zeros(n, dtype=np.int8)
+
+    if n >= lookback:
+        # Fenêtres glissantes en vues ; argmax/argmin → première occurrence, comme idxmax
+        fenetres_h = np.lib.stride_tricks.sliding_window_view(highs, lookback)
+        fenetres_l = np.lib.stride_tricks.sliding_window_view(lows, lookback)
+        i_high = fenetres_h.argmax(axis=1)
+        i_low = fenetres_l.argmin(axis=1)
+        lignes = np.arange(n - lookback + 1)
+        fib_high[lookback - 1:] = fenetres_h[lignes, i_high]
+        fib_low[lookback - 1:] = fenetres_l[lignes, i_low]
+        tendance[lookback - 1:] = np.where(i_high > i_low, -1, 1)
+
+    diff = fib_high - fib_low
+    hausse = tendance == 1
+    df['FIB_HIGH'] = fib_high
+    df['FIB_LOW'] = fib_low
+    df['FIB_TREND'] = tendance
+    for nom, r in FIB_RATIOS.items():
+        df[nom] = np.where(hausse, fib_high - diff * r, fib_low + diff * r)
+    return df
 
 # --- PARTIE PRINCIPALE ---
 if __name__ == "__main__":
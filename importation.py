@@ -0,0 +1,532 @@
+# importation.py - Import en masse d'archives de barres (CSV / Parquet) vers le BarStore
+#
+# yf.download est limité (historique intraday court) et ne lit pas les archives
+# CSV de plusieurs Go des fournisseurs. Ici :
+# - le CSV est découpé en morceaux (fin de ligne), analysés en parallèle par
+#   pyarrow (ThreadPoolExecutor : pyarrow relâche le GIL), types imposés
+#   (dates → timestamp, prix → float64) : pas de détection de type ligne à ligne
+# - les morceaux sont convertis tout de suite en tableaux NumPy et recollés
+# - fuseaux horaires : dates naïves localisées (tz) AVANT tri et doublons (l'heure
+#   répétée de l'automne n'est pas un doublon), heures inexistantes ou ambiguës
+#   retirées et comptées ; dates avec décalage → UTC ; conversion finale (to_tz)
+# - tri, doublons (la dernière ligne gagne, comme BarStore), lignes vides, trous
+# - écriture dans le BarStore (Parquet, un fichier par ticker et intervalle)
+#
+# Les DataFrames produits ont le format de get_market_data : ils passent
+# directement dans add_indicators et FibonacciBacktester.
+#
+# Limite : un champ CSV entre guillemets ne doit pas contenir de retour à la ligne
+# (le découpage en morceaux se fait sur les fins de ligne).
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from donnees import OHLCV_COLUMNS
+from stockage import BarStore
+
+# Noms de colonnes reconnus (en minuscules) → nom standard
+_ALIAS = {
+    'date': 'Date', 'datetime': 'Date', 'timestamp': 'Date', 'time': 'Date', '<date>': 'Date',
+    'open': 'Open', 'o': 'Open', '<open>': 'Open',
+    'high': 'High', 'h': 'High', '<high>': 'High',
+    'low': 'Low', 'l': 'Low', '<low>': 'Low',
+    'close': 'Close', 'c': 'Close', '<close>': 'Close', 'last': 'Close',
+    'volume': 'Volume', 'vol': 'Volume', 'v': 'Volume', '<vol>': 'Volume',
+    'symbol': 'Symbol', 'ticker': 'Symbol', '<ticker>': 'Symbol',
+}
+
+# Écart médian entre barres (secondes) → intervalle du BarStore
+_INTERVALLES = {60: '1m', 120: '2m', 300: '5m', 900: '15m', 1800: '30m',
+                3600: '1h', 86400: '1d', 7 * 86400: '1wk'}
+
+_MORCEAU = 64 << 20  # 64 Mo de CSV par morceau
+_NAT = np.iinfo(np.int64).min  # NaT en int64
+
+
+# ============================================================================
+# 1️⃣ LECTURE (CSV en morceaux parallèles, Parquet par groupes de lignes)
+# ============================================================================
+
+def _colonnes_standard(noms, columns=None, allow_close_only=False):
+    """
+    {nom dans le fichier: nom standard} pour les colonnes utiles.
+    Open / High / Low / Close sont exigées (Fibonacci et le backtester en ont besoin),
+    sauf avec allow_close_only : seule Close l'est alors.
+    """
+    columns = columns or {}
+    correspondance = {}
+    for nom in noms:
+        standard = columns[nom] if nom in columns else _ALIAS.get(nom.strip().lower())
+        if standard == 'Date' and 'Date' in correspondance.values():
+            # ex : colonnes Date + Time séparées → on refuse plutôt que de perdre l'heure
+            raise ValueError(f"Plusieurs colonnes de dates ({list(correspondance)[0]}, {nom}) : "
+                             f"choisir avec columns={{'{nom}': None}} ou fusionner les colonnes.")
+        if standard and standard not in correspondance.values():
+            correspondance[nom] = standard
+    requises = {'Date', 'Close'} if allow_close_only else {'Date', 'Open', 'High', 'Low', 'Close'}
+    manquantes = requises - set(correspondance.values())
+    if manquantes:
+        raise ValueError(f"Colonnes introuvables : {sorted(manquantes)} (colonnes du fichier : {list(noms)}). "
+                         f"Utiliser columns={{'nom_fournisseur': 'Close', ...}}"
+                         f"{'' if allow_close_only else ', ou allow_close_only=True'}.")
+    return correspondance
+
+
+def _types_arrow(correspondance, date_unit, dtype, date_tz):
+    import pyarrow as pa
+
+    types = {}
+    for nom, standard in correspondance.items():
+        if standard == 'Date':
+            types[nom] = pa.int64() if date_unit else pa.timestamp('ns', tz=date_tz)
+        elif standard == 'Symbol':
+            types[nom] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            types[nom] = pa.from_numpy_dtype(np.dtype(dtype))
+    return types
+
+
+def _en_numpy(table, correspondance, date_unit):
+    """Table pyarrow → {nom standard: tableau NumPy} (dates en int64 ns)."""
+    import pyarrow.compute as pc
+
+    colonnes = {}
+    for nom, standard in correspondance.items():
+        colonne = table.column(nom)
+        if standard == 'Date' and date_unit:
+            # Entiers lus en int64 (to_numpy passerait en float64 s'il manque des valeurs,
+            # et perdrait la précision des epochs en us / ns) ; manquants → NaT, retirés ensuite
+            valeurs = pc.fill_null(colonne, 0).cast('int64').to_numpy() * _ns_par(date_unit)
+            if colonne.null_count:
+                valeurs[colonne.is_null().to_numpy()] = _NAT
+            colonnes['Date'] = valeurs
+        elif standard == 'Date':
+            colonnes['Date'] = colonne.to_numpy().view(np.int64)
+        elif standard == 'Symbol':
+            # Dictionnaire propre au morceau : recodé plus tard dans un dictionnaire global
+            colonne = colonne.combine_chunks()
+            colonnes['Symbol'] = (colonne.indices.to_numpy(zero_copy_only=False),
+                                  colonne.dictionary.to_pylist())
+        else:
+            colonnes[standard] = colonne.to_numpy()
+    return colonnes
+
+
+def _ns_par(unite):
+    return {'s': 10**9, 'ms': 10**6, 'us': 10**3, 'ns': 1}[unite]
+
+
+def _bornes(chemin, taille_morceau):
+    """Ligne d'en-tête + (début, fin) de chaque morceau, coupés sur des fins de ligne."""
+    taille = os.path.getsize(chemin)
+    with open(chemin, 'rb') as f:
+        entete = f.readline()
+        bornes, debut = [], f.tell()
+        while debut < taille:
+            f.seek(min(debut + taille_morceau, taille))
+            f.readline()
+            fin = min(f.tell(), taille)
+            bornes.append((debut, fin))
+            debut = fin
+    return entete, bornes
+
+
+def _lire_csv(chemin, columns, date_unit, dtype, delimiter, chunk_size, workers, allow_close_only):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    entete, bornes = _bornes(chemin, chunk_size)
+    noms = [nom.strip().strip('"') for nom in entete.decode('utf-8-sig').rstrip('\r\n').split(delimiter)]
+    correspondance = _colonnes_standard(noms, columns, allow_close_only)
+    lecture = pacsv.ReadOptions(column_names=noms, use_threads=False, block_size=max(chunk_size, 1 << 20))
+    analyse = pacsv.ParseOptions(delimiter=delimiter)
+
+    def analyser(borne, date_tz):
+        with open(chemin, 'rb') as f:
+            f.seek(borne[0])
+            brut = f.read(borne[1] - borne[0])
+        conversion = pacsv.ConvertOptions(column_types=_types_arrow(correspondance, date_unit, dtype, date_tz),
+                                          include_columns=list(correspondance))
+        table = pacsv.read_csv(pa.BufferReader(brut), read_options=lecture,
+                               parse_options=analyse, convert_options=conversion)
+        return _en_numpy(table, correspondance, date_unit)
+
+    if not bornes:
+        return [], correspondance, False
+
+    # Premier morceau seul : dates naïves ou avec décalage horaire (→ UTC) ?
+    date_tz = None
+    try:
+        premier = analyser(bornes[0], None)
+    except pa.ArrowInvalid as e:
+        # Seule l'erreur « décalage horaire présent » fait relire en UTC ; une autre
+        # (nombre invalide, mauvais séparateur...) est remontée telle quelle
+        if date_unit or 'zone offset' not in str(e):
+            raise
+        date_tz = 'UTC'
+        premier = analyser(bornes[0], date_tz)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        morceaux = [premier] + list(pool.map(lambda b: analyser(b, date_tz), bornes[1:]))
+    return morceaux, correspondance, date_tz is not None
+
+
+def _lire_parquet(chemin, columns, date_unit, dtype, allow_close_only):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fichier = pq.ParquetFile(chemin)
+    noms = fichier.schema_arrow.names
+    correspondance = _colonnes_standard(noms, columns, allow_close_only)
+    # Lecture multi-thread par groupe de lignes ; les types sont ensuite imposés
+    table = pq.read_table(chemin, columns=list(correspondance), use_threads=True)
+    date_tz = None
+    for nom, standard in correspondance.items():
+        colonne = table.column(nom)
+        if standard == 'Date' and not date_unit:
+            type_date = colonne.type
+            if pa.types.is_timestamp(type_date):
+                date_tz = 'UTC' if type_date.tz is not None else None
+            table = table.set_column(table.schema.get_field_index(nom), nom,
+                                     colonne.cast(pa.timestamp('ns', tz=date_tz)))
+        elif standard == 'Symbol':
+            table = table.set_column(table.schema.get_field_index(nom), nom, colonne.dictionary_encode()
+                                     if not pa.types.is_dictionary(colonne.type) else colonne)
+        elif standard != 'Date':
+            table = table.set_column(table.schema.get_field_index(nom), nom,
+                                     colonne.cast(pa.from_numpy_dtype(np.dtype(dtype))))
+    return [_en_numpy(table, correspondance, date_unit)], correspondance, date_tz is not None
+
+
+# ============================================================================
+# 2️⃣ NETTOYAGE (tri, doublons, lignes vides, trous)
+# ============================================================================
+
+def _recoller(morceaux, correspondance):
+    """Concatène les morceaux ; symboles recodés dans un dictionnaire commun."""
+    colonnes = {standard: morceaux[0][standard] if len(morceaux) == 1
+                else np.concatenate([m[standard] for m in morceaux])
+                for standard in correspondance.values() if standard != 'Symbol'}
+    symboles = ['']
+    if 'Symbol' in correspondance.values():
+        symboles, codes = {}, []
+        for m in morceaux:
+            indices, dictionnaire = m['Symbol']
+            recodage = np.array([symboles.setdefault(s, len(symboles)) for s in dictionnaire], dtype=np.int32)
+            codes.append(recodage[indices] if len(recodage) else indices)
+        colonnes['Symbol'] = np.concatenate(codes)
+        symboles = list(symboles)
+    return colonnes, symboles
+
+
+def _trous(dates, max_gap_factor, top=10):
+    """Écarts > max_gap_factor × écart médian (même règle que ingestion.validate_bars)."""
+    if len(dates) < 3:
+        return 0, [], None
+    ecarts = np.diff(dates)
+    mediane = np.median(ecarts)
+    trous = np.flatnonzero(ecarts > mediane * max_gap_factor)
+    plus_grands = trous[np.argsort(ecarts[trous])[::-1][:top]]
+    return len(trous), sorted(int(i) for i in plus_grands), int(mediane)
+
+
+def _intervalle(secondes):
+    """Intervalle du BarStore déduit de l'écart médian en secondes (1m, 5m, 1h, 1d...)."""
+    if secondes is None:
+        return None
+    # Données journalières : le week-end ne change pas la médiane (1 jour)
+    for pas, nom in _INTERVALLES.items():
+        if abs(secondes - pas) <= pas * 0.1:
+            return nom
+    return None
+
+
+def _retirer(dates, colonnes, masque):
+    if not masque.any():
+        return dates, colonnes
+    return dates[~masque], {nom: valeurs[~masque] for nom, valeurs in colonnes.items()}
+
+
+def _localiser(dates, tz):
+    """
+    Dates naïves (heure locale de `tz`, ordre du fichier) → int64 ns UTC.
+
+    Returns:
+        (dates UTC, masque des heures ambiguës, masque des heures inexistantes) ;
+        ces heures-là valent NaT et sont à retirer
+    """
+    index = pd.DatetimeIndex(dates.view('M8[ns]'))
+    # Heures inexistantes (avance au printemps) : ambiguïté tranchée arbitrairement pour
+    # ne repérer qu'elles
+    inexistantes = np.asarray(index.tz_localize(tz, ambiguous=np.ones(len(index), dtype=bool),
+                                                nonexistent='NaT').isna())
+    try:
+        # Recul d'automne : 01:30 apparaît deux fois, l'ordre du fichier dit laquelle est la première
+        locales = index.tz_localize(tz, ambiguous='infer', nonexistent='NaT')
+    except ValueError:
+        # Ordre inexploitable (fichier non trié, doublons dans l'heure répétée) : on ne devine pas
+        locales = index.tz_localize(tz, ambiguous='NaT', nonexistent='NaT')
+    manquantes = np.asarray(locales.isna())
+    return locales.asi8, manquantes & ~inexistantes, inexistantes
+
+
+def _nettoyer(dates, colonnes, max_gap_factor, rapport):
+    """
+    Trie par date, retire les doublons (la dernière ligne gagne) et les lignes sans prix.
+    Les dates sont déjà définitives (UTC si un fuseau est connu) : deux barres
+    tombées sur le même instant après localisation sont bien vues comme doublons.
+
+    Returns:
+        dates, colonnes, rapport
+    """
+    trie = bool(np.all(dates[1:] >= dates[:-1]))
+    if not trie:
+        ordre = np.argsort(dates, kind='stable')
+        dates = dates[ordre]
+        colonnes = {nom: valeurs[ordre] for nom, valeurs in colonnes.items()}
+    rapport['sorted'] = trie
+
+    garder = np.empty(len(dates), dtype=bool)
+    garder[:-1] = dates[1:] != dates[:-1]
+    garder[-1:] = True
+    rapport['duplicates'] = int(len(dates) - garder.sum())
+
+    prix = [colonnes[nom] for nom in ('Open', 'High', 'Low', 'Close') if nom in colonnes]
+    vides = np.logical_and.reduce([np.isnan(p) for p in prix])
+    rapport['empty_rows'] = int((vides & garder).sum())
+    garder &= ~vides
+
+    if not garder.all():
+        dates = dates[garder]
+        colonnes = {nom: valeurs[garder] for nom, valeurs in colonnes.items()}
+
+    rapport['rows'] = len(dates)
+    rapport['nan_rows'] = int(np.logical_or.reduce([np.isnan(p) for p in prix]).sum()) if len(dates) else 0
+    rapport['bad_ohlc'] = int((colonnes['High'] < colonnes['Low']).sum()) \
+        if {'High', 'Low'} <= set(colonnes) else 0
+    rapport['gaps'], positions, rapport['median_step_s'] = _trous(dates, max_gap_factor)
+    rapport['largest_gaps'] = [(int(dates[i]), int(dates[i + 1])) for i in positions]
+    if rapport['median_step_s'] is not None:
+        rapport['median_step_s'] = rapport['median_step_s'] / 1e9
+    return dates, colonnes, rapport
+
+
+def _dataframe(dates, colonnes, utc, tz):
+    """
+    Tableaux → DataFrame au format get_market_data (index 'Date', colonnes OHLCV).
+    dates en UTC si utc (affichées dans le fuseau tz), naïves sinon.
+    """
+    index = pd.DatetimeIndex(dates.view('M8[ns]'), name='Date')
+    if utc:
+        index = index.tz_localize('UTC')
+        if tz is not None:
+            index = index.tz_convert(tz)
+    return pd.DataFrame({nom: colonnes[nom] for nom in OHLCV_COLUMNS if nom in colonnes},
+                        index=index, copy=False)
+
+
+# ============================================================================
+# 3️⃣ IMPORT
+# ============================================================================
+
+def read_bars_file(path, columns=None, date_unit=None, tz=None, to_tz=None, dtype='float64',
+                   delimiter=',', chunk_size=_MORCEAU, workers=None, max_gap_factor=5.0,
+                   allow_close_only=False):
+    """
+    Lit une archive CSV ou Parquet de barres.
+
+    Args:
+        columns : {nom dans le fichier: 'Date'/'Open'/.../'Symbol', ou None pour l'ignorer}
+                  si les noms ne sont pas reconnus automatiquement (Date, Timestamp, Open, <CLOSE>, Vol...)
+        date_unit : 's', 'ms', 'us' ou 'ns' si les dates sont des entiers (epoch)
+        tz : fuseau des dates naïves du fichier (None = laissées naïves). Les heures
+             inexistantes (printemps) et ambiguës non déductibles de l'ordre du fichier
+             (automne) sont retirées et comptées dans le rapport
+        to_tz : fuseau de sortie (défaut : tz), ex : 'UTC', 'America/New_York'
+        dtype : type des prix et volumes ('float64' ou 'float32')
+        chunk_size : octets de CSV par morceau analysé en parallèle
+        workers : threads d'analyse (défaut : nombre de CPU)
+        allow_close_only : accepte un fichier sans Open / High / Low (le rapport liste
+                           les colonnes manquantes ; Fibonacci et le backtester en ont besoin)
+
+    Returns:
+        ({ticker: DataFrame}, {ticker: rapport}) ; ticker = '' sans colonne Symbol
+    """
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        morceaux, correspondance, aware = _lire_parquet(path, columns, date_unit, dtype, allow_close_only)
+    else:
+        morceaux, correspondance, aware = _lire_csv(path, columns, date_unit, dtype, delimiter,
+                                                    chunk_size, workers, allow_close_only)
+    if not morceaux:
+        return {}, {}
+    if to_tz is not None and tz is None and not aware:
+        raise ValueError("Dates naïves : préciser tz (fuseau du fichier) pour les convertir en to_tz.")
+    manquantes = [nom for nom in OHLCV_COLUMNS if nom not in correspondance.values()]
+
+    colonnes, symboles = _recoller(morceaux, correspondance)
+    dates = colonnes.pop('Date')
+    codes = colonnes.pop('Symbol', None)
+
+    # Un groupe de lignes par symbole (tri stable : l'ordre du fichier départage les doublons)
+    if codes is None:
+        groupes = [('', slice(None))]
+    else:
+        ordre = np.argsort(codes, kind='stable')
+        codes_tries = codes[ordre]
+        coupures = np.flatnonzero(np.diff(codes_tries)) + 1
+        groupes = [(symboles[codes[p[0]]], p) for p in np.split(ordre, coupures) if len(p)]
+
+    frames, rapports = {}, {}
+    for ticker, lignes in groupes:
+        d, c = dates[lignes], {nom: v[lignes] for nom, v in colonnes.items()}
+        rapport = {'rows_read': len(d), 'missing_columns': manquantes, 'warnings': []}
+        if set(manquantes) - {'Volume'}:  # Volume reste facultatif
+            rapport['warnings'].append(f"colonnes absentes : {', '.join(manquantes)}")
+
+        sans_date = d == _NAT  # date illisible ou absente
+        rapport['bad_dates'] = int(sans_date.sum())
+        d, c = _retirer(d, c, sans_date)
+
+        # Localisation AVANT le tri et les doublons : l'heure répétée de l'automne
+        # n'est pas un doublon, et deux barres peuvent tomber sur le même instant
+        rapport['ambiguous_rows'] = rapport['nonexistent_rows'] = 0
+        if tz is not None and not aware:
+            utc, ambigues, inexistantes = _localiser(d, tz)
+            rapport['ambiguous_rows'] = int(ambigues.sum())
+            rapport['nonexistent_rows'] = int(inexistantes.sum())
+            if rapport['ambiguous_rows'] or rapport['nonexistent_rows']:
+                retirees = d[ambigues | inexistantes][:10].view('M8[ns]')
+                rapport['warnings'].append(
+                    f"{rapport['ambiguous_rows']} heure(s) ambiguë(s) et {rapport['nonexistent_rows']} "
+                    f"heure(s) inexistante(s) en {tz} retirées (changement d'heure), ex : "
+                    f"{', '.join(np.datetime_as_string(retirees, unit='s'))}")
+            d, c = _retirer(utc, c, ambigues | inexistantes)
+
+        d, c, rapport = _nettoyer(d, c, max_gap_factor, rapport)
+        df = _dataframe(d, c, aware or tz is not None, to_tz or tz)
+        rapport['interval'] = _intervalle(rapport['median_step_s'])
+        rapport['largest_gaps'] = [(str(df.index[np.searchsorted(d, a)]), str(df.index[np.searchsorted(d, b)]))
+                                   for a, b in rapport['largest_gaps']]
+        if len(df):
+            rapport['first'], rapport['last'] = str(df.index[0]), str(df.index[-1])
+        frames[ticker] = df
+        rapports[ticker] = rapport
+    return frames, rapports
+
+
+def import_bars(paths, store=None, ticker=None, interval=None, append=False, **options):
+    """
+    Importe une ou plusieurs archives dans le BarStore.
+
+    Args:
+        paths : fichier ou liste de fichiers (.csv ou .parquet)
+        ticker : symbole si le fichier n'a pas de colonne Symbol (défaut : nom du fichier)
+        interval : intervalle du store (défaut : déduit de l'écart médian, ex : '1m', '1d')
+        append : fusionne avec les barres déjà stockées (plusieurs fichiers d'un même
+                 ticker sont toujours fusionnés entre eux)
+        options : passées à read_bars_file (columns, tz, to_tz, date_unit, workers...)
+
+    Returns:
+        dict {'files', 'rows_read', 'rows', 'seconds', 'rows_per_s', 'tickers': {ticker: rapport}}
+    """
+    store = store or BarStore()
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    debut = time.perf_counter()
+    tickers, deja = {}, set()
+
+    for chemin in paths:
+        frames, rapports = read_bars_file(chemin, **options)
+        for nom, df in frames.items():
+            symbole = nom or ticker or os.path.basename(chemin).split('.')[0]
+            rapport = rapports[nom]
+            rapport['file'] = str(chemin)
+            rapport['interval'] = interval or rapport['interval']
+            if rapport['interval'] is None:
+                raise ValueError(f"{chemin} : intervalle non reconnu pour {symbole} "
+                                 f"(écart médian {rapport['median_step_s']} s), préciser interval=...")
+            cle = (symbole, rapport['interval'])
+            rapport['stored_rows'] = store.write(symbole, df, interval=rapport['interval'],
+                                                 append=append or cle in deja)
+            deja.add(cle)
+            tickers.setdefault(symbole, []).append(rapport)
+
+    secondes = time.perf_counter() - debut
+    lues = sum(r['rows_read'] for liste in tickers.values() for r in liste)
+    return {
+        'files': len(paths),
+        'rows_read': lues,
+        'rows': sum(r['rows'] for liste in tickers.values() for r in liste),
+        'seconds': round(secondes, 3),
+        'rows_per_s': round(lues / secondes) if secondes else None,
+        'tickers': {t: liste[0] if len(liste) == 1 else liste for t, liste in tickers.items()},
+    }
+
+
+# ============================================================================
+# 4️⃣ ZONE DE TEST (benchmark)
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    from backtest import FibonacciBacktester
+    from donnees import add_indicators, calculate_fibonacci
+
+    print("🧪 TEST IMPORTATION.PY")
+    print("=" * 60)
+
+    dossier = tempfile.mkdtemp()
+    n = 5_000_000
+    dates = pd.date_range("2015-01-01", periods=n, freq="min").as_unit('ns')
+    prix = 2000 + np.cumsum(np.random.normal(0, 0.5, n))
+    # Archive de fournisseur : un trou d'une journée, trois lignes en double à la fin
+    lignes = np.r_[0:1000, 2440:n, 5:8]
+    archive = pa.table({'timestamp': dates.values[lignes], 'open': prix[lignes],
+                        'high': prix[lignes] + 0.5, 'low': prix[lignes] - 0.5,
+                        'close': prix[lignes], 'volume': np.full(len(lignes), 100)})
+    csv = os.path.join(dossier, "XAUUSD.csv")
+    pacsv.write_csv(archive, csv)
+    pq.write_table(archive, os.path.join(dossier, "XAUUSD.parquet"))
+    print(f"  archive : {len(lignes):,} lignes, {os.path.getsize(csv) / 1e6:.0f} Mo de CSV, "
+          f"{os.cpu_count()} CPU")
+
+    t = time.perf_counter()
+    read_bars_file(csv)
+    print(f"  analyse CSV seule : {len(lignes) / (time.perf_counter() - t) / 1e6:.2f} M lignes/s")
+    t = time.perf_counter()
+    pd.read_csv(csv, index_col=0, parse_dates=True)
+    print(f"  pd.read_csv (référence) : {len(lignes) / (time.perf_counter() - t) / 1e6:.2f} M lignes/s")
+
+    store = BarStore(os.path.join(dossier, "store"))
+    for fichier in ("XAUUSD.csv", "XAUUSD.parquet"):
+        resume = import_bars(os.path.join(dossier, fichier), store=store, tz='UTC')
+        r = resume['tickers']['XAUUSD']
+        print(f"  import {fichier:15s} (lecture + nettoyage + écriture) : {resume['seconds']:.2f} s "
+              f"→ {resume['rows_per_s'] / 1e6:.2f} M lignes/s | doublons={r['duplicates']} "
+              f"trous={r['gaps']} intervalle={r['interval']}")
+
+    # Plusieurs symboles dans un fichier, dates avec décalage horaire
+    multi = os.path.join(dossier, "multi.csv")
+    with open(multi, 'w') as f:
+        f.write("Ticker;Date;Open;High;Low;Close;Vol\n")
+        for jour in range(1, 29):
+            for symbole in ("AAA", "BBB"):
+                f.write(f"{symbole};2024-02-{jour:02d}T09:00:00+01:00;10;11;9;10.5;1000\n")
+    resume = import_bars(multi, store=store, delimiter=';', to_tz='Europe/Paris')
+    print(f"  multi-symboles : { {t: (r['rows'], r['interval'], r['first']) for t, r in resume['tickers'].items()} }")
+
+    df = store.read("XAUUSD", interval="1m").tail(3000)
+    add_indicators(df)
+    tester = FibonacciBacktester(df)
+    tester.generate_signals(calculate_fibonacci, lookback=50)
+    tester.run_backtest()
+    print(f"  add_indicators + backtest sur les barres importées : "
+          f"{tester.get_metrics()['total_trades']} trades, index {df.index.tz}")
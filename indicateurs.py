@@ -0,0 +1,532 @@
+# indicateurs.py - Noyaux d'indicateurs en NumPy pur (sans pandas_ta)
+#
+# Toutes les fonctions travaillent sur des tableaux NumPy :
+#   - 1-D : une série de prix (barres,)
+#   - 2-D : plusieurs actifs à la fois (barres × actifs), calcul le long de l'axe 0
+# Le paramètre dtype=np.float32 divise la mémoire par deux (précision ~1e-6).
+#
+# Les résultats reproduisent pandas_ta (mêmes conventions de démarrage et mêmes NaN) :
+#   - ema  : première valeur = SMA des `length` premières barres, puis récurrence
+#   - rsi  : moyenne de Wilder (alpha = 1/length) comme ta.rsi
+#   - macd : (MACD, histogramme, signal) comme les colonnes MACD_12_26_9 / MACDh / MACDs
+#
+# Prix manquants (NaN), comme pandas ewm (ignore_na=False) :
+#   - NaN en tête (historique plus court) : la colonne démarre à sa première valeur
+#   - NaN au milieu : l'indicateur garde sa valeur précédente sur la barre
+#     manquante, puis la récurrence reprend (au lieu de propager le NaN)
+
+import time
+
+import numpy as np
+
+# Poids maximal w^-L autorisé dans un bloc de la récurrence (voir _recurrence)
+_MAX_POIDS = {np.dtype(np.float64): 1e200, np.dtype(np.float32): 1e18}
+_BLOC_MAX = 1 << 16
+
+
+# ============================================================================
+# 1️⃣ RÉCURRENCE LINÉAIRE VECTORISÉE
+# ============================================================================
+
+def _recurrence(x, w, b, y0, out):
+    """
+    Calcule out[t] = w * out[t-1] + b * x[t] avec out[-1] = y0, sans boucle par barre.
+
+    Sur un bloc de L barres, la récurrence a une forme fermée :
+        out[j] = w^(j+1) * (y0 + b * cumsum(x[k] * w^-(k+1)))
+    L est choisi pour que w^-L ne déborde pas. Tous les blocs complets sont
+    calculés d'un coup (vue 2-D de `out`), puis on raccorde les blocs entre eux.
+    `out` sert de tampon : `x` et `out` peuvent être le même tableau.
+    """
+    n = x.shape[0]
+    if n == 0:
+        return out
+    dtype = out.dtype
+
+    if w <= 0.0:
+        np.multiply(x, b, out=out)
+        return out
+
+    taille = int(np.log(_MAX_POIDS[dtype]) / -np.log(w)) if w < 1.0 else _BLOC_MAX
+    taille = max(1, min(taille, _BLOC_MAX, n))
+
+    forme = (taille,) + (1,) * (x.ndim - 1)
+    poids = np.power(1.0 / w, np.arange(1, taille + 1, dtype=np.float64)).astype(dtype).reshape(forme)
+
+    prec = np.asarray(y0, dtype=dtype)
+    debut = 0
+
+    nb = n // taille
+    if nb > 1:
+        blocs = out[:nb * taille].view()
+        try:
+            blocs.shape = (nb, taille) + x.shape[1:]
+        except AttributeError:
+            blocs = None  # `out` non contigu : on reste sur la boucle par bloc
+        if blocs is not None:
+            _recurrence_blocs(x[:nb * taille].reshape(blocs.shape), w ** taille, b, prec, poids, blocs)
+            debut = nb * taille
+            prec = out[debut - 1].copy()
+
+    for debut in range(debut, n, taille):
+        fin = min(debut + taille, n)
+        p = poids[:fin - debut]
+        bloc = out[debut:fin]
+        np.multiply(x[debut:fin], p, out=bloc)
+        np.cumsum(bloc, axis=0, out=bloc)
+        if b != 1.0:
+            bloc *= b
+        bloc += prec
+        bloc /= p
+        prec = bloc[-1].copy()
+    return out
+
+
+def _recurrence_blocs(x, w_bloc, b, y0, poids, out):
+    """
+    Version "tous les blocs à la fois" de _recurrence (x et out : (blocs, L, ...)).
+
+    Chaque bloc est d'abord résolu en partant de 0, puis on ajoute la valeur de
+    départ réelle de chaque bloc (fin du bloc précédent) : départ[k] = fin[k-1]
+    + w^L * départ[k-1]. Comme w^L est en général sous la précision machine,
+    deux termes suffisent et tout reste vectorisé.
+    """
+    nb = x.shape[0]
+    p = poids[np.newaxis]
+    np.multiply(x, p, out=out)
+    np.cumsum(out, axis=1, out=out)
+    if b != 1.0:
+        out *= b
+
+    fins = out[:, -1] / poids[-1]
+    departs = np.empty_like(fins)
+    departs[0] = y0
+    if w_bloc <= np.finfo(out.dtype).eps:
+        departs[1:] = fins[:-1]
+        departs[1] += w_bloc * y0
+        departs[2:] += w_bloc * fins[:-2]
+    else:
+        for k in range(1, nb):
+            departs[k] = fins[k - 1] + w_bloc * departs[k - 1]
+
+    out += departs.reshape((nb, 1) + x.shape[2:])
+    out /= p
+    return out
+
+
+def _ema_trous(x, alpha, y0, out):
+    """
+    Récurrence de l'EMA (adjust=False) sur une série 1-D contenant des NaN, comme
+    pandas ewm(ignore_na=False) : une barre NaN recopie la valeur précédente, et la
+    première barre après k NaN pèse alpha / ((1 - alpha)^(k+1) + alpha).
+    Les segments sans NaN passent par _recurrence.
+    """
+    w = 1.0 - alpha
+    valides = ~np.isnan(x)
+    limites = np.concatenate(([0], np.flatnonzero(np.diff(valides.astype(np.int8))) + 1, [len(x)]))
+    prec, trou = y0, 0
+    for debut, fin in zip(limites[:-1], limites[1:]):
+        if not valides[debut]:
+            out[debut:fin] = prec
+            trou = fin - debut
+            continue
+        if trou:
+            c = w ** (trou + 1)
+            out[debut] = prec = (c * prec + alpha * x[debut]) / (c + alpha)
+            debut += 1
+            trou = 0
+        if debut < fin:
+            _recurrence(x[debut:fin], w, alpha, prec, out[debut:fin])
+            prec = out[fin - 1]
+    return out
+
+
+def _preparer(x, dtype):
+    x = np.asarray(x)
+    dtype = np.dtype(dtype or (x.dtype if x.dtype in _MAX_POIDS else np.float64))
+    return np.asarray(x, dtype=dtype), dtype
+
+
+# ============================================================================
+# 2️⃣ INDICATEURS
+# ============================================================================
+
+def ema(x, length=10, dtype=None, out=None):
+    """
+    Moyenne mobile exponentielle (alpha = 2 / (length + 1)), démarrée par une SMA.
+
+    Args:
+        x : tableau (barres,) ou (barres, actifs)
+        length : période
+        dtype : np.float64 (défaut) ou np.float32
+        out : tableau de sortie optionnel (même forme que x)
+
+    Returns:
+        np.ndarray avec NaN sur les `length - 1` premières barres
+    """
+    x, dtype = _preparer(x, dtype)
+    if out is None:
+        out = np.empty(x.shape, dtype=dtype)
+    trous = np.isnan(x).any(axis=0)
+    if x.ndim > 1 and trous.any():
+        # Colonnes complètes ensemble, colonnes avec des NaN une par une
+        complets = ~trous
+        if complets.any():
+            out[:, complets] = ema(x[:, complets], length, dtype=dtype)
+        for j in np.flatnonzero(trous):
+            ema(x[:, j], length, dtype=dtype, out=out[:, j])
+        return out
+    trous = bool(trous.any())
+
+    # Première valeur connue (NaN en tête : historique plus court)
+    premier = int(np.argmax(~np.isnan(x))) if trous else 0
+    n = x.shape[0] - premier
+    if n < length or (trous and np.isnan(x[premier])):
+        out[:] = np.nan
+        return out
+
+    alpha = 2.0 / (length + 1)
+    depart = premier + length
+    out[:depart - 1] = np.nan
+    out[depart - 1] = np.nanmean(x[premier:depart], axis=0) if trous else x[:length].mean(axis=0)
+    if trous and np.isnan(x[depart:]).any():
+        _ema_trous(x[depart:], alpha, out[depart - 1], out[depart:])
+    else:
+        _recurrence(x[depart:], 1.0 - alpha, alpha, out[depart - 1], out[depart:])
+    return out
+
+
+def rsi(close, length=14, dtype=None, out=None):
+    """
+    RSI de Wilder, identique à ta.rsi(close, length).
+
+    Les moyennes des hausses et des baisses utilisent alpha = 1/length ; leurs
+    facteurs de normalisation se simplifient dans le ratio, on ne calcule donc
+    que les sommes pondérées.
+
+    Une variation manquante (NaN) compte pour zéro dans les deux sommes : comme
+    pandas ewm, le poids des barres précédentes décroît quand même et le RSI
+    garde sa valeur. NaN tant que `length` variations connues n'ont pas été vues.
+
+    Returns:
+        np.ndarray (0-100) avec NaN sur les `length` premières barres
+    """
+    close, dtype = _preparer(close, dtype)
+    if out is None:
+        out = np.empty(close.shape, dtype=dtype)
+    n = close.shape[0]
+    out[:min(length, n)] = np.nan
+    if n <= length:
+        return out
+
+    w = 1.0 - 1.0 / length
+    zero = np.zeros(close.shape[1:], dtype=dtype)
+
+    # Hausses dans `out`, baisses dans `baisses` : une seule allocation temporaire
+    hausses = out[1:]
+    baisses = np.subtract(close[1:], close[:-1], dtype=dtype)
+    np.maximum(baisses, 0, out=hausses)
+    np.negative(baisses, out=baisses)
+    np.maximum(baisses, 0, out=baisses)
+    manquantes = np.isnan(baisses)
+    if manquantes.any():
+        hausses[manquantes] = 0
+        baisses[manquantes] = 0
+
+    _recurrence(hausses, w, 1.0, zero, hausses)
+    _recurrence(baisses, w, 1.0, zero, baisses)
+
+    baisses += hausses
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(hausses, baisses, out=hausses)
+    hausses *= 100
+    out[:length] = np.nan
+    if manquantes.any():
+        hausses[np.cumsum(~manquantes, axis=0) < length] = np.nan
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9, dtype=None):
+    """
+    MACD comme ta.macd : ligne MACD, histogramme et ligne de signal.
+
+    Returns:
+        (macd, histogramme, signal) : trois np.ndarray de la forme de close
+    """
+    close, dtype = _preparer(close, dtype)
+    if fast > slow:
+        fast, slow = slow, fast
+
+    ligne = ema(close, slow, dtype=dtype)
+    rapide = ema(close, fast, dtype=dtype)
+    # ligne = rapide - lente, calculé en place
+    np.subtract(rapide, ligne, out=ligne)
+
+    sig = rapide  # on réutilise le tampon de l'EMA rapide
+    if np.isnan(close[:1]).any():
+        # NaN en tête : la ligne MACD démarre à une barre différente selon la colonne
+        ema(ligne, signal, dtype=dtype, out=sig)
+    else:
+        sig[:slow - 1] = np.nan
+        ema(ligne[slow - 1:], signal, dtype=dtype, out=sig[slow - 1:])
+
+    hist = np.subtract(ligne, sig)
+    return ligne, hist, sig
+
+
+def _rolling_extreme(x, window, ufunc, neutre, out=None):
+    """
+    Max/min glissant en O(n) quelle que soit la fenêtre (algorithme de van Herk /
+    Gil-Werman) : préfixes et suffixes cumulés par blocs de `window` barres.
+    """
+    x = np.asarray(x)
+    if out is None:
+        out = np.empty(x.shape, dtype=np.result_type(x.dtype, np.float32))
+    n = x.shape[0]
+    if n < window:
+        out[:] = np.nan
+        return out
+
+    nb_blocs = -(-n // window)
+    forme = (nb_blocs * window,) + x.shape[1:]
+    prefixe = np.full(forme, neutre, dtype=out.dtype)
+    prefixe[:n] = x
+    suffixe = prefixe.copy()
+
+    blocs = (nb_blocs, window) + x.shape[1:]
+    ufunc.accumulate(prefixe.reshape(blocs), axis=1, out=prefixe.reshape(blocs))
+    inverse = suffixe.reshape(blocs)[:, ::-1]
+    ufunc.accumulate(inverse, axis=1, out=inverse)
+
+    out[:window - 1] = np.nan
+    ufunc(suffixe[:n - window + 1], prefixe[window - 1:n], out=out[window - 1:])
+    return out
+
+
+def rolling_max(x, window, out=None):
+    """Plus haut glissant sur `window` barres (NaN sur les window-1 premières)."""
+    return _rolling_extreme(x, window, np.maximum, -np.inf, out)
+
+
+def rolling_min(x, window, out=None):
+    """Plus bas glissant sur `window` barres (NaN sur les window-1 premières)."""
+    return _rolling_extreme(x, window, np.minimum, np.inf, out)
+
+
+# ============================================================================
+# 3️⃣ VERSIONS INCRÉMENTALES (une barre à la fois, O(1))
+# ============================================================================
+# Mêmes formules que ema / rsi / macd ci-dessus, pour un flux temps réel :
+# chaque update(x) renvoie la valeur de l'indicateur sur la nouvelle barre.
+# to_dict() / from_dict() permettent de sauvegarder l'état (reprise d'un backtest).
+
+class _EtatSimple:
+    """État composé uniquement de nombres : sérialisable tel quel."""
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, etat):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(etat)
+        return obj
+
+
+class EMAState(_EtatSimple):
+    """EMA incrémentale : NaN pendant les `length - 1` premières barres, puis SMA, puis récurrence."""
+
+    def __init__(self, length=10):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = float('nan')
+
+    def update(self, x):
+        self.count += 1
+        if self.count < self.length:
+            self.total += x
+        elif self.count == self.length:
+            self.value = (self.total + x) / self.length
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RSIState(_EtatSimple):
+    """RSI de Wilder incrémental (NaN sur les `length` premières barres)."""
+
+    def __init__(self, length=14):
+        self.length = length
+        self.w = 1.0 - 1.0 / length
+        self.count = 0
+        self.prev = None
+        self.hausses = 0.0
+        self.baisses = 0.0
+        self.value = float('nan')
+
+    def update(self, close):
+        if self.prev is not None:
+            d = close - self.prev
+            self.hausses = self.w * self.hausses + (d if d > 0 else 0.0)
+            self.baisses = self.w * self.baisses + (-d if d < 0 else 0.0)
+            self.count += 1
+            total = self.hausses + self.baisses
+            if self.count >= self.length:
+                self.value = 100.0 * self.hausses / total if total > 0 else float('nan')
+        self.prev = close
+        return self.value
+
+
+class MACDState:
+    """MACD incrémental : update(close) → (macd, histogramme, signal)."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        if fast > slow:
+            fast, slow = slow, fast
+        self.rapide = EMAState(fast)
+        self.lente = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.value = (float('nan'),) * 3
+
+    def update(self, close):
+        rapide = self.rapide.update(close)
+        lente = self.lente.update(close)
+        if lente == lente:  # la ligne MACD n'existe qu'une fois l'EMA lente prête
+            ligne = rapide - lente
+            sig = self.signal.update(ligne)
+            self.value = (ligne, ligne - sig, sig)
+        return self.value
+
+    def to_dict(self):
+        return {'rapide': self.rapide.to_dict(), 'lente': self.lente.to_dict(),
+                'signal': self.signal.to_dict(), 'value': list(self.value)}
+
+    @classmethod
+    def from_dict(cls, etat):
+        obj = cls.__new__(cls)
+        obj.rapide = EMAState.from_dict(etat['rapide'])
+        obj.lente = EMAState.from_dict(etat['lente'])
+        obj.signal = EMAState.from_dict(etat['signal'])
+        obj.value = tuple(etat['value'])
+        return obj
+
+
+# ============================================================================
+# 4️⃣ COMPARAISON AVEC PANDAS_TA ET BENCHMARK
+# ============================================================================
+
+def compare_pandas_ta(close, atol=1e-6):
+    """
+    Compare les noyaux à pandas_ta sur une série de clôtures (si pandas_ta est installé).
+
+    Returns:
+        dict {indicateur: écart absolu maximal}
+    """
+    import pandas as pd
+    import pandas_ta as ta
+
+    serie = pd.Series(np.asarray(close, dtype=np.float64))
+    ligne, hist, sig = macd(serie.values)
+    ref_macd = ta.macd(serie)
+
+    ecarts = {
+        'rsi': np.nanmax(np.abs(rsi(serie.values) - ta.rsi(serie, length=14).values)),
+        'ema': np.nanmax(np.abs(ema(serie.values, 20) - ta.ema(serie, length=20).values)),
+        'macd': np.nanmax(np.abs(ligne - ref_macd['MACD_12_26_9'].values)),
+        'macdh': np.nanmax(np.abs(hist - ref_macd['MACDh_12_26_9'].values)),
+        'macds': np.nanmax(np.abs(sig - ref_macd['MACDs_12_26_9'].values)),
+    }
+    for nom, ecart in ecarts.items():
+        statut = "✅" if ecart <= atol else "❌"
+        print(f"  {statut} {nom:6s} écart max = {ecart:.2e}")
+    return ecarts
+
+
+def benchmark(n_bars=10_000_000, n_assets=1, dtype=np.float64, repeat=3):
+    """
+    Mesure le débit (barres/seconde) de chaque noyau sur une marche aléatoire.
+
+    Returns:
+        dict {indicateur: millions de barres par seconde}
+    """
+    rng = np.random.default_rng(0)
+    forme = (n_bars,) if n_assets == 1 else (n_bars, n_assets)
+    close = (2000 + np.cumsum(rng.normal(0, 1, forme), axis=0)).astype(dtype)
+
+    noyaux = {
+        'ema_20': lambda: ema(close, 20, dtype=dtype),
+        'rsi_14': lambda: rsi(close, 14, dtype=dtype),
+        'macd_12_26_9': lambda: macd(close, dtype=dtype),
+        'rolling_max_50': lambda: rolling_max(close, 50),
+        'rolling_min_50': lambda: rolling_min(close, 50),
+    }
+
+    total = n_bars * n_assets
+    resultats = {}
+    print(f"📏 Benchmark : {n_bars:,} barres × {n_assets} actif(s), {np.dtype(dtype).name}")
+    for nom, noyau in noyaux.items():
+        meilleur = float('inf')
+        for _ in range(repeat):
+            debut = time.perf_counter()
+            noyau()
+            meilleur = min(meilleur, time.perf_counter() - debut)
+        resultats[nom] = total / meilleur / 1e6
+        print(f"  {nom:16s} {meilleur * 1000:8.1f} ms  →  {resultats[nom]:7.1f} M barres/s")
+    return resultats
+
+
+# ============================================================================
+# 5️⃣ ZONE DE TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    print("🧪 TEST INDICATEURS.PY")
+    print("=" * 60)
+
+    try:
+        prix = 2000 + np.cumsum(np.random.default_rng(1).normal(0, 5, 5000))
+        compare_pandas_ta(prix)
+    except ImportError:
+        print("⚠️  pandas_ta non installé : comparaison ignorée.")
+
+    # NaN au milieu et en tête (panneau multi-actifs à historiques inégaux) :
+    # référence = formules de pandas_ta en pandas, colonne par colonne
+    import pandas as pd
+
+    def ema_pandas(s, length):
+        s = s.copy()
+        depart = s.iloc[:length].mean()
+        s.iloc[:length - 1] = np.nan
+        s.iloc[length - 1] = depart
+        return s.ewm(span=length, adjust=False).mean()
+
+    def rsi_pandas(s, length=14):
+        d = s.diff()
+        moyennes = [v.where(d.notna()).ewm(alpha=1 / length, min_periods=length).mean()
+                    for v in (d.clip(lower=0), -d.clip(upper=0))]
+        return 100 * moyennes[0] / (moyennes[0] + moyennes[1])
+
+    panneau = 2000 + np.cumsum(np.random.default_rng(2).normal(0, 5, (600, 3)), axis=0)
+    panneau[100, 0] = np.nan
+    panneau[250:253, 0] = np.nan
+    panneau[:300, 1] = np.nan
+    ligne, _, sig = macd(panneau)
+    for j, nom in enumerate(("NaN au milieu", "NaN en tête", "complet")):
+        s = pd.Series(panneau[:, j])
+        s = s.loc[s.first_valid_index():]
+        ref = ema_pandas(s, 12) - ema_pandas(s, 26)
+        refs = {'ema': (ema(panneau, 20)[:, j], ema_pandas(s, 20)),
+                'rsi': (rsi(panneau)[:, j], rsi_pandas(s)),
+                'macd': (ligne[:, j], ref),
+                'macds': (sig[:, j], ema_pandas(ref.loc[ref.first_valid_index():], 9))}
+        for indicateur, (valeurs, attendu) in refs.items():
+            attendu = attendu.reindex(range(len(panneau))).values
+            ok = np.array_equal(np.isnan(valeurs), np.isnan(attendu)) \
+                and np.nanmax(np.abs(valeurs - attendu)) < 1e-6
+            print(f"  {'✅' if ok else '❌'} {nom:14s} {indicateur:6s} NaN = {int(np.isnan(valeurs).sum())}")
+
+    benchmark(dtype=np.float64)
+    benchmark(dtype=np.float32)
+    benchmark(n_bars=1_000_000, n_assets=10, dtype=np.float32)
@@ -0,0 +1,307 @@
+# ingestion.py - Téléchargement en masse d'un univers de tickers
+#
+# - plusieurs tickers en parallèle (ThreadPoolExecutor), sous une limite de
+#   requêtes par seconde commune à tous les threads
+# - nouvelles tentatives avec attente exponentielle en cas d'erreur passagère
+# - normalisation (MultiIndex Yahoo → colonnes OHLCV) et validation des barres
+# - écriture directe dans un BarStore (stockage.py)
+#
+# Les réponses peuvent être enregistrées (RecordingSource) puis rejouées sans
+# réseau (FixtureSource) : tout le pipeline se teste hors ligne.
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from donnees import normalize_ohlcv
+from stockage import BarStore
+
+
+# ============================================================================
+# 1️⃣ LIMITE DE DÉBIT
+# ============================================================================
+
+class RateLimiter:
+    """
+    Seau à jetons partagé entre threads : au plus `rate` requêtes par seconde,
+    avec des rafales de `burst` requêtes.
+    """
+
+    def __init__(self, rate=5.0, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._jetons = float(self.burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._dernier = clock()
+        self._verrou = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'une requête soit autorisée."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._verrou:
+                maintenant = self._clock()
+                self._jetons = min(self.burst, self._jetons + (maintenant - self._dernier) * self.rate)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.rate
+            self._sleep(attente)
+
+
+# ============================================================================
+# 2️⃣ SOURCES DE DONNÉES
+# ============================================================================
+
+class YahooSource:
+    """Réponses brutes de yf.download, un ticker par requête."""
+
+    def __init__(self, period="1y", interval="1d"):
+        self.period = period
+        self.interval = interval
+
+    def fetch(self, ticker):
+        import yfinance as yf
+        return yf.download(ticker, period=self.period, interval=self.interval,
+                           progress=False, threads=False)
+
+
+class RecordingSource:
+    """Enveloppe une source et enregistre chaque réponse brute dans `directory`."""
+
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        self.interval = getattr(source, 'interval', '1d')
+        os.makedirs(directory, exist_ok=True)
+
+    def fetch(self, ticker):
+        df = self.source.fetch(ticker)
+        df.to_parquet(_fixture_path(self.directory, ticker))
+        return df
+
+
+class FixtureSource:
+    """
+    Rejoue les réponses enregistrées par RecordingSource (aucun accès réseau).
+
+    Args:
+        directory : dossier des fixtures
+        failures : {ticker: n} → les n premiers appels lèvent ConnectionError
+                   (pour tester les nouvelles tentatives)
+    """
+
+    def __init__(self, directory, interval="1d", failures=None):
+        self.directory = directory
+        self.interval = interval
+        self._echecs = dict(failures or {})
+        self._verrou = threading.Lock()
+
+    def fetch(self, ticker):
+        with self._verrou:
+            if self._echecs.get(ticker, 0) > 0:
+                self._echecs[ticker] -= 1
+                raise ConnectionError(f"Erreur simulée pour {ticker}")
+        chemin = _fixture_path(self.directory, ticker)
+        if not os.path.exists(chemin):
+            return pd.DataFrame()
+        return pd.read_parquet(chemin)
+
+
+class StoreSource:
+    """Barres déjà stockées dans un BarStore (ex : remplies par ingest_universe)."""
+
+    def __init__(self, store, interval="1d"):
+        self.store = store
+        self.interval = interval
+
+    def fetch(self, ticker):
+        if not self.store.exists(ticker, self.interval):
+            return pd.DataFrame()
+        return self.store.read(ticker, interval=self.interval)
+
+
+def _fixture_path(directory, ticker):
+    return os.path.join(directory, ticker.replace('/', '_') + ".parquet")
+
+
+# ============================================================================
+# 3️⃣ VALIDATION
+# ============================================================================
+
+def validate_bars(df, max_gap_factor=5.0):
+    """
+    Contrôle qualité d'une série de barres.
+
+    Un trou est un écart entre deux barres supérieur à `max_gap_factor` fois
+    l'écart médian (ex : plus de 5 jours pour des barres journalières, ce qui
+    laisse passer les week-ends et jours fériés).
+
+    Returns:
+        dict avec rows, duplicates, monotonic, gaps (liste de (début, fin)),
+        nan_rows, bad_ohlc (High < Low)
+    """
+    index = df.index
+    rapport = {
+        'rows': len(df),
+        'duplicates': int(index.duplicated().sum()),
+        'monotonic': bool(index.is_monotonic_increasing),
+        'gaps': [],
+        'nan_rows': int(df.isna().any(axis=1).sum()),
+        'bad_ohlc': int((df['High'] < df['Low']).sum()) if {'High', 'Low'} <= set(df.columns) else 0,
+    }
+
+    if len(df) > 2:
+        trie = index.sort_values().unique()
+        ecarts = trie[1:] - trie[:-1]
+        seuil = ecarts.median() * max_gap_factor
+        trous = ecarts > seuil
+        rapport['gaps'] = [(str(trie[i]), str(trie[i + 1])) for i in trous.nonzero()[0]]
+
+    return rapport
+
+
+def clean_bars(df):
+    """
+    Trie l'index, supprime les dates en double (garde la dernière) et les lignes
+    dont un prix (Open / High / Low / Close) manque, comme le dropna() de
+    get_market_data : une barre partielle fausserait RSI et signaux en silence.
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind='stable')
+    if df.index.has_duplicates:
+        df = df[~df.index.duplicated(keep='last')]
+    prix = [nom for nom in ('Open', 'High', 'Low', 'Close') if nom in df.columns]
+    return df.dropna(subset=prix or None, how='any' if prix else 'all')
+
+
+# ============================================================================
+# 4️⃣ PIPELINE
+# ============================================================================
+
+class EmptyResponse(ValueError):
+    """La source n'a renvoyé aucune barre (souvent passager chez Yahoo)."""
+
+
+def _passagere(erreur):
+    """Erreur réseau ou réponse vide : vaut une nouvelle tentative. Le reste est définitif."""
+    if isinstance(erreur, EmptyResponse):
+        return True
+    # OSError couvre ConnectionError, TimeoutError, socket et requests.RequestException ;
+    # un fichier absent ou interdit (fixtures, store) ne s'arrangera pas en attendant
+    return isinstance(erreur, OSError) and not isinstance(
+        erreur, (FileNotFoundError, PermissionError, IsADirectoryError, NotADirectoryError))
+
+
+def fetch_with_retry(source, ticker, limiter=None, retries=3, backoff=1.0, sleep=time.sleep):
+    """
+    Télécharge un ticker avec nouvelles tentatives (attente backoff × 2^n + aléa).
+    Seules les erreurs réseau et les réponses vides sont retentées ; une autre
+    erreur (symbole refusé, bug) est relancée tout de suite.
+
+    Returns:
+        (DataFrame brut, nombre de tentatives)
+    """
+    for tentative in range(1, retries + 2):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            df = source.fetch(ticker)
+            if df is None or df.empty:
+                raise EmptyResponse(f"Aucune donnée reçue pour {ticker}")
+            return df, tentative
+        except Exception as e:
+            if tentative > retries or not _passagere(e):
+                e.attempts = tentative
+                raise
+            sleep(backoff * (2 ** (tentative - 1)) * (1 + random.random() * 0.1))
+
+
+def ingest_universe(tickers, source=None, store=None, workers=8, rate=5.0, retries=3,
+                    backoff=1.0, append=False, sleep=time.sleep):
+    """
+    Télécharge, valide et stocke un univers de tickers en parallèle.
+
+    Args:
+        tickers : liste de symboles Yahoo
+        source : YahooSource (défaut), FixtureSource, RecordingSource...
+        store : BarStore de destination (défaut : BarStore())
+        workers : nombre de téléchargements simultanés
+        rate : requêtes par seconde maximum (tous threads confondus, 0 = illimité)
+
+    Returns:
+        dict {ticker: {'status', 'rows', 'attempts', 'seconds', 'validation', 'error'}}
+    """
+    source = source or YahooSource()
+    store = store or BarStore()
+    interval = getattr(source, 'interval', '1d')
+    limiter = RateLimiter(rate, sleep=sleep)
+
+    def traiter(ticker):
+        debut = time.perf_counter()
+        resultat = {'status': 'ok', 'rows': 0, 'attempts': 0, 'validation': None, 'error': None}
+        try:
+            brut, resultat['attempts'] = fetch_with_retry(
+                source, ticker, limiter, retries=retries, backoff=backoff, sleep=sleep)
+            df = normalize_ohlcv(brut, ticker)
+            resultat['validation'] = validate_bars(df)
+            df = clean_bars(df)
+            resultat['rows'] = store.write(ticker, df, interval=interval, append=append)
+        except Exception as e:
+            resultat['status'] = 'error'
+            resultat['error'] = f"{type(e).__name__}: {e}"
+            if resultat['attempts'] == 0:
+                # échec du téléchargement lui-même (tentatives notées par fetch_with_retry)
+                resultat['attempts'] = getattr(e, 'attempts', retries + 1)
+        resultat['seconds'] = round(time.perf_counter() - debut, 3)
+        return ticker, resultat
+
+    tickers = list(dict.fromkeys(tickers))  # sans doublons, ordre conservé
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(pool.map(traiter, tickers))
+
+
+# ============================================================================
+# 5️⃣ ZONE DE TEST (hors ligne)
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+    import numpy as np
+
+    print("🧪 TEST INGESTION.PY (fixtures locales)")
+    print("=" * 60)
+
+    dossier = tempfile.mkdtemp()
+    fixtures = os.path.join(dossier, "fixtures")
+    os.makedirs(fixtures)
+
+    # Réponses au format yf.download (colonnes MultiIndex (Price, Ticker))
+    dates = pd.date_range("2024-01-01", periods=120, freq="B", name="Date")
+    for t in ["GC=F", "^NDX", "SI=F"]:
+        prix = 2000 + np.cumsum(np.random.normal(0, 5, len(dates)))
+        brut = pd.DataFrame({'Close': prix, 'High': prix + 5, 'Low': prix - 5,
+                             'Open': prix, 'Volume': 1000.0}, index=dates)
+        if t == "SI=F":
+            brut = pd.concat([brut.iloc[:50], brut.iloc[60:], brut.iloc[[10]]])  # trou + doublon
+            brut.iloc[20, 0] = np.nan  # barre partielle (Close manquant)
+        brut.columns = pd.MultiIndex.from_product([brut.columns, [t]], names=['Price', 'Ticker'])
+        brut.to_parquet(_fixture_path(fixtures, t))
+
+    resume = ingest_universe(
+        ["GC=F", "^NDX", "SI=F", "INCONNU"],
+        source=FixtureSource(fixtures, failures={"GC=F": 2}),
+        store=BarStore(os.path.join(dossier, "store")),
+        workers=4, rate=0, backoff=0.01
+    )
+    for ticker, r in resume.items():
+        v = r['validation'] or {}
+        print(f"  {ticker:8s} {r['status']:5s} lignes={r['rows']:4d} tentatives={r['attempts']} "
+              f"doublons={v.get('duplicates')} trous={len(v.get('gaps', []))} {r['error'] or ''}")
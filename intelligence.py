@@ -1,14 +1,14 @@
 import os
+import importlib.util
 from datetime import datetime
 
 # --- CONFIGURATION IA ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
-try:
-    from openai import OpenAI
-    HAS_OPENAI = True
-except ImportError:
-    HAS_OPENAI = False
+# On vérifie seulement la présence du paquet : l'import réel (lent) est fait
+# au moment de l'appel API.
+HAS_OPENAI = importlib.util.find_spec("openai") is not None
+if not HAS_OPENAI:
     print("⚠️  OpenAI non installé. Mode MANUEL activé.")
 
 
@@ -107,6 +107,7 @@ def call_openai_api(prompt, model="gpt-3.5-turbo", temperature=0.7):
         return None  # Mode manuel
     
     try:
+        from openai import OpenAI
         client = OpenAI(api_key=OPENAI_API_KEY)
         response = client.chat.completions.create(
             model=model,
@@ -184,6 +185,55 @@ def generate_ai_analysis(price, rsi, macd_line, macd_signal, fib_levels, trend,
         }
 
 
+def generate_ai_analysis_prefiltered(df, model, market="OR", min_confidence=0.5):
+    """
+    Comme generate_ai_analysis, mais un modèle local (modele.SignalModel) décide
+    d'abord si l'appel au LLM vaut la peine : seulement si, sur la dernière barre,
+    il prédit ACHAT ou VENTE avec une probabilité ≥ min_confidence.
+    Sinon la réponse est immédiate, sans appel réseau (mode 'LOCAL').
+    
+    Args:
+        df : DataFrame ou barres.Bars avec les colonnes de add_indicators
+        model : SignalModel entraîné
+    
+    Returns:
+        dict : mêmes clés que generate_ai_analysis + 'model_proba'
+    """
+    import numpy as np
+    from donnees import calculate_fibonacci
+    from modele import CLASSES, build_features
+    
+    X, _ = build_features(df, model.lookback)
+    proba = model.predict_proba(X[-1:])[0]
+    model_proba = {classe: round(float(p), 4) for classe, p in zip(CLASSES, proba)}
+    
+    if not max(proba[0], proba[1]) >= min_confidence:
+        details = " / ".join(f"{classe} {p:.0%}" for classe, p in model_proba.items())
+        return {
+            'signal': 'NEUTRE 🟡',
+            'analysis': f"🧮 Modèle local : {details}. Pas d'opportunité claire, l'IA n'a pas été sollicitée.",
+            'prompt_used': None,
+            'mode': 'LOCAL',
+            'model_proba': model_proba
+        }
+    
+    def derniere(colonne):
+        return np.asarray(df[colonne])[-1]
+    
+    fib_levels, _, _, trend = calculate_fibonacci(df, lookback=model.lookback)
+    resultat = generate_ai_analysis(
+        price=derniere('Close'),
+        rsi=derniere('RSI'),
+        macd_line=derniere('MACD_12_26_9'),
+        macd_signal=derniere('MACDs_12_26_9'),
+        fib_levels=fib_levels,
+        trend=trend,
+        market=market
+    )
+    resultat['model_proba'] = model_proba
+    return resultat
+
+
 # ============================================================================
 # 4️⃣ EXTRACTION DU SIGNAL (Parser la réponse IA)
 # ============================================================================
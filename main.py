@@ -5,6 +5,7 @@ import sys
 # 1. IMPORTATION DES MODULES
 try:
     from donnees import get_market_data, add_indicators, calculate_fibonacci
+    from barres import Bars
     # Attention : Assure-toi que le fichier s'appelle bien intelligence.py
     from intelligence import generate_ai_analysis 
     from backtest import FibonacciBacktester, print_backtest_report, plot_backtest_results
@@ -21,25 +22,25 @@ def demarrer_projet():
 
     # --- PHASE 1 : DONNÉES (Étudiante 1) ---
     print("\n[1/3] Récupération des données (OR)...")
-    df = get_market_data("GC=F") 
-    df = add_indicators(df)
+    # Bars : colonnes NumPy nommées, partagées sans copie jusqu'au backtest
+    bars = Bars.from_pandas(get_market_data("GC=F"))
+    add_indicators(bars)
     
     # Calcul initial pour l'affichage
-    fibs, high, low, trend = calculate_fibonacci(df)
-    print(f"   -> Données chargées ({len(df)} jours).")
+    fibs, high, low, trend = calculate_fibonacci(bars)
+    print(f"   -> Données chargées ({len(bars)} jours).")
     print(f"   -> Tendance détectée : {trend.upper()}")
 
     # --- PHASE 2 : INTELLIGENCE ARTIFICIELLE (Étudiante 2) ---
     print("\n[2/3] Analyse de l'IA en cours...")
     
     # Préparation des données spécifiques pour ton code IA avancé
-    last_price = df['Close'].iloc[-1]
-    last_rsi = df['RSI'].iloc[-1]
+    last_price = bars['Close'][-1]
+    last_rsi = bars['RSI'][-1]
     
-    # On cherche les colonnes MACD (pandas_ta les nomme parfois bizarrement)
-    # On prend les 2 dernières colonnes qui sont généralement MACD et Signal
-    macd_line = df.iloc[-1, -2] 
-    macd_signal = df.iloc[-1, -1] 
+    # Colonnes MACD par leur nom (ligne MACD et ligne de signal)
+    macd_line = bars['MACD_12_26_9'][-1]
+    macd_signal = bars['MACDs_12_26_9'][-1]
 
     # Appel au cerveau de l'IA
     resultat_ia = generate_ai_analysis(
@@ -62,7 +63,7 @@ def demarrer_projet():
     print("\n[3/3] Backtest et Validation...")
     
     # Initialisation de la classe de l'étudiante 3
-    tester = FibonacciBacktester(df, initial_capital=10000)
+    tester = FibonacciBacktester(bars, initial_capital=10000)
     
     # Génération des signaux (On passe la fonction calculate_fibonacci)
     tester.generate_signals(calculate_fibonacci, lookback=50)
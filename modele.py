@@ -0,0 +1,315 @@
+# modele.py - Modèle de signal local (régression logistique en NumPy)
+#
+# Apprend à prédire ACHAT / VENTE / NEUTRE à partir des colonnes de
+# add_indicators (RSI, MACD) et add_fibonacci (niveaux par barre), sans appel
+# réseau : l'inférence sur tout un historique prend quelques millisecondes.
+#
+# Trois usages :
+# - source de signaux pour FibonacciBacktester (generate_model_signals)
+# - décision rapide barre par barre (boucles temps réel)
+# - préfiltre : n'appeler le LLM que quand le modèle voit une opportunité
+#   (intelligence.generate_ai_analysis_prefiltered)
+
+import json
+import os
+
+import numpy as np
+
+from barres import Bars
+from donnees import add_indicators, add_fibonacci
+
+CLASSES = ('ACHAT', 'VENTE', 'NEUTRE')
+
+FEATURES = ('rsi', 'macd', 'macd_hist', 'macd_signal', 'fib_position', 'fib_trend',
+            'dist_382', 'dist_618', 'fib_range', 'ret_1', 'ret_5')
+
+# Signal de backtest correspondant à chaque classe
+_SIGNAL_BACKTEST = {'ACHAT': 'ACHAT', 'VENTE': 'VENTE', 'NEUTRE': 'HOLD'}
+
+
+# ============================================================================
+# 1️⃣ VARIABLES ET ÉTIQUETTES
+# ============================================================================
+
+def build_features(df, lookback=50):
+    """
+    Matrice des variables (une ligne par barre, colonnes dans l'ordre de FEATURES).
+
+    Les colonnes RSI / MACD / FIB_* déjà présentes sont réutilisées ; sinon elles
+    sont calculées sur une copie (df n'est pas modifié).
+
+    Returns:
+        (X float64 (n, len(FEATURES)), valid bool (n,)) : valid = barre sans NaN
+        (les premières barres, avant la fin du préchauffage des indicateurs, ne le sont pas)
+    """
+    vue = df
+    if 'RSI' not in df.columns or 'FIB_TREND' not in df.columns:
+        # Colonnes ajoutées sur une copie (une vue pour un Bars), comme FibonacciBacktester
+        vue = df[:] if isinstance(df, Bars) else df.copy()
+    if 'RSI' not in vue.columns:
+        add_indicators(vue)
+    if 'FIB_TREND' not in vue.columns:
+        add_fibonacci(vue, lookback)
+
+    close = np.asarray(vue['Close'], dtype=np.float64)
+    haut = np.asarray(vue['FIB_HIGH'], dtype=np.float64)
+    bas = np.asarray(vue['FIB_LOW'], dtype=np.float64)
+    etendue = haut - bas
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position = np.where(etendue > 0, (close - bas) / etendue, 0.5)
+        rendement_1 = np.full(len(close), np.nan)
+        rendement_5 = np.full(len(close), np.nan)
+        rendement_1[1:] = np.log(close[1:] / close[:-1]) * 100
+        rendement_5[5:] = np.log(close[5:] / close[:-5]) * 100
+
+        X = np.column_stack([
+            (np.asarray(vue['RSI'], dtype=np.float64) - 50) / 50,
+            np.asarray(vue['MACD_12_26_9'], dtype=np.float64) / close * 100,
+            np.asarray(vue['MACDh_12_26_9'], dtype=np.float64) / close * 100,
+            np.asarray(vue['MACDs_12_26_9'], dtype=np.float64) / close * 100,
+            np.where(np.isnan(haut), np.nan, position),
+            np.asarray(vue['FIB_TREND'], dtype=np.float64),
+            (close - np.asarray(vue['FIB_382'], dtype=np.float64)) / close * 100,
+            (close - np.asarray(vue['FIB_618'], dtype=np.float64)) / close * 100,
+            etendue / close * 100,
+            rendement_1,
+            rendement_5,
+        ])
+    return X, ~np.isnan(X).any(axis=1)
+
+
+def make_labels(close, horizon=5, threshold_pct=1.0):
+    """
+    Étiquette de chaque barre d'après le rendement des `horizon` barres suivantes :
+    > +threshold_pct % → ACHAT (0), < -threshold_pct % → VENTE (1), sinon NEUTRE (2).
+    Les `horizon` dernières barres (futur inconnu) valent -1.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    y = np.full(len(close), -1, dtype=np.int64)
+    if len(close) <= horizon:
+        return y
+    futur = (close[horizon:] / close[:-horizon] - 1) * 100
+    y[:-horizon] = np.where(futur > threshold_pct, 0, np.where(futur < -threshold_pct, 1, 2))
+    return y
+
+
+# ============================================================================
+# 2️⃣ MODÈLE
+# ============================================================================
+
+class SignalModel:
+    """
+    Régression logistique multinomiale (softmax) avec pénalité L2, entraînée par
+    descente de gradient sur les variables standardisées.
+
+    Exemple :
+        model = SignalModel().fit(X[valid & (y >= 0)], y[valid & (y >= 0)])
+        model.predict(X)            # ['NEUTRE', 'ACHAT', ...]
+        model.signals(bars)         # ['HOLD', 'ACHAT', ...] pour le backtester
+        model.save("modele.json")
+    """
+
+    def __init__(self, l2=1e-3, learning_rate=0.5, iterations=500, balanced=True,
+                 lookback=50, horizon=5, threshold_pct=1.0):
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.balanced = balanced
+        # Paramètres des variables / étiquettes (gardés avec le modèle sauvegardé)
+        self.lookback = lookback
+        self.horizon = horizon
+        self.threshold_pct = threshold_pct
+
+        self.mean = None
+        self.std = None
+        self.weights = None  # (len(FEATURES), len(CLASSES))
+        self.bias = None
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.int64)
+        n, k = X.shape
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0)
+        self.std[self.std == 0] = 1.0
+        # Disposition (variables, barres) / (classes, barres) : les réductions sur
+        # les 3 classes se font entre lignes contiguës, bien plus vite que sur l'axe court
+        Zt = np.ascontiguousarray(((X - self.mean) / self.std).T)
+
+        cible = np.zeros((len(CLASSES), n))
+        cible[y, np.arange(n)] = 1.0
+        # Classes équilibrées : NEUTRE domine souvent et écraserait ACHAT / VENTE
+        effectifs = cible.sum(axis=1)
+        poids_classe = n / (len(CLASSES) * np.maximum(effectifs, 1)) if self.balanced else np.ones(len(CLASSES))
+        poids = poids_classe[y]
+        poids /= poids.sum()
+
+        Wt = np.zeros((len(CLASSES), k))
+        b = np.zeros((len(CLASSES), 1))
+        for _ in range(self.iterations):
+            erreur = (_softmax(Wt @ Zt + b) - cible) * poids
+            Wt -= self.learning_rate * (erreur @ Zt.T + self.l2 * Wt)
+            b -= self.learning_rate * erreur.sum(axis=1, keepdims=True)
+
+        self.weights = Wt.T
+        self.bias = b.ravel()
+        return self
+
+    def predict_proba(self, X):
+        """Probabilités (n, 3) dans l'ordre de CLASSES ; NaN pour les lignes incomplètes."""
+        X = np.asarray(X, dtype=np.float64)
+        scores = (self.weights / self.std[:, None]).T @ X.T  # standardisation intégrée aux poids
+        scores += (self.bias - (self.mean / self.std) @ self.weights)[:, None]
+        proba = _softmax(scores).T
+        proba[np.isnan(X).any(axis=1)] = np.nan
+        return proba
+
+    def predict(self, X):
+        """Classe la plus probable ('ACHAT' / 'VENTE' / 'NEUTRE') ; NEUTRE si ligne incomplète."""
+        proba = self.predict_proba(X)
+        indices = np.where(np.isnan(proba[:, 0]), 2, np.argmax(np.nan_to_num(proba), axis=1))
+        return np.asarray(CLASSES)[indices]
+
+    def signals(self, df, min_confidence=0.0):
+        """
+        Signaux de backtest ('ACHAT' / 'VENTE' / 'HOLD') pour chaque barre de df.
+        Une prédiction dont la probabilité est < min_confidence devient HOLD.
+        """
+        X, _ = build_features(df, self.lookback)
+        proba = self.predict_proba(X)
+        meilleure = np.argmax(np.nan_to_num(proba), axis=1)
+        confiance = np.nan_to_num(proba.max(axis=1))  # 0 pour les barres de préchauffage
+        meilleure[confiance < max(min_confidence, 1e-12)] = 2
+        return np.asarray([_SIGNAL_BACKTEST[c] for c in CLASSES])[meilleure]
+
+    def opportunities(self, df, min_confidence=0.5):
+        """
+        Préfiltre : True pour les barres où le modèle prédit ACHAT ou VENTE avec une
+        probabilité ≥ min_confidence (celles où un avis du LLM vaut son coût).
+        """
+        proba = np.nan_to_num(self.predict_proba(build_features(df, self.lookback)[0]))
+        return proba[:, :2].max(axis=1) >= min_confidence
+
+    # --- Sauvegarde (JSON, comme les snapshots du backtester) -----------------
+
+    def to_dict(self):
+        return {
+            'version': 1,
+            'features': list(FEATURES),
+            'classes': list(CLASSES),
+            'params': {'l2': self.l2, 'learning_rate': self.learning_rate,
+                       'iterations': self.iterations, 'balanced': self.balanced,
+                       'lookback': self.lookback, 'horizon': self.horizon,
+                       'threshold_pct': self.threshold_pct},
+            'mean': self.mean.tolist(),
+            'std': self.std.tolist(),
+            'weights': self.weights.tolist(),
+            'bias': self.bias.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        if tuple(d['features']) != FEATURES or tuple(d['classes']) != CLASSES:
+            raise ValueError("Modèle entraîné avec d'autres variables / classes.")
+        model = cls(**d['params'])
+        model.mean = np.asarray(d['mean'])
+        model.std = np.asarray(d['std'])
+        model.weights = np.asarray(d['weights'])
+        model.bias = np.asarray(d['bias'])
+        return model
+
+    def save(self, path):
+        temporaire = f"{path}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temporaire, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _softmax(scores):
+    """Softmax par colonne d'un tableau (classes, barres)."""
+    exp = np.exp(scores - scores.max(axis=0))
+    exp /= exp.sum(axis=0)
+    return exp
+
+
+# ============================================================================
+# 3️⃣ ENTRAÎNEMENT
+# ============================================================================
+
+def train_signal_model(df, lookback=50, horizon=5, threshold_pct=1.0, test_size=0.3, **params):
+    """
+    Entraîne un SignalModel sur df (DataFrame ou Bars) avec un découpage
+    chronologique : les `test_size` dernières barres servent d'évaluation.
+
+    Returns:
+        (model, rapport) : rapport = tailles, exactitude train / test, exactitude
+        de la classe majoritaire (référence), répartition des classes
+    """
+    X, valid = build_features(df, lookback)
+    y = make_labels(df['Close'], horizon, threshold_pct)
+    lignes = np.flatnonzero(valid & (y >= 0))
+    coupure = int(len(lignes) * (1 - test_size))
+    train, test = lignes[:coupure], lignes[coupure:]
+    if len(train) == 0:
+        raise ValueError("Pas assez de barres pour entraîner le modèle.")
+
+    model = SignalModel(lookback=lookback, horizon=horizon, threshold_pct=threshold_pct, **params)
+    model.fit(X[train], y[train])
+
+    def exactitude(lignes_):
+        if len(lignes_) == 0:
+            return None
+        predites = np.argmax(model.predict_proba(X[lignes_]), axis=1)
+        return round(float((predites == y[lignes_]).mean()), 4)
+
+    majoritaire = np.bincount(y[train], minlength=len(CLASSES)).argmax()
+    rapport = {
+        'train_rows': int(len(train)),
+        'test_rows': int(len(test)),
+        'train_accuracy': exactitude(train),
+        'test_accuracy': exactitude(test),
+        'baseline_accuracy': round(float((y[test] == majoritaire).mean()), 4) if len(test) else None,
+        'class_counts': {c: int((y[lignes] == i).sum()) for i, c in enumerate(CLASSES)},
+    }
+    return model, rapport
+
+
+# ============================================================================
+# 4️⃣ ZONE DE TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    from barres import Bars
+
+    print("🧪 TEST MODELE.PY")
+    print("=" * 60)
+
+    n = 100_000
+    rng = np.random.default_rng(0)
+    prix = 2000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    bars = Bars.from_pandas(pd.DataFrame(
+        {'High': prix * 1.003, 'Low': prix * 0.997, 'Close': prix},
+        index=pd.date_range("1800-01-01", periods=n, freq="D", name="Date")))
+
+    t = time.perf_counter()
+    model, rapport = train_signal_model(bars)
+    print(f"  Entraînement ({n} barres) : {time.perf_counter() - t:.2f} s → {rapport}")
+
+    X, valid = build_features(bars)
+    t = time.perf_counter()
+    model.predict_proba(X)
+    print(f"  Inférence sur {n} barres : {(time.perf_counter() - t) * 1e3:.1f} ms")
+
+    t = time.perf_counter()
+    signaux = model.signals(bars)
+    print(f"  Signaux (variables + inférence) : {(time.perf_counter() - t) * 1e3:.1f} ms, "
+          f"{dict(zip(*np.unique(signaux, return_counts=True)))}")
+    print(f"  Préfiltre LLM (confiance ≥ 0.5) : {model.opportunities(bars).mean():.1%} des barres")
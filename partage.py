@@ -0,0 +1,346 @@
+# partage.py - Serveur de données de marché en mémoire partagée
+#
+# Sans serveur, chaque session Streamlit et chaque commande de la CLI
+# télécharge et garde sa propre copie des barres et des indicateurs.
+# Ici un seul processus (python cli.py serve ...) :
+# - charge chaque jeu de barres une fois, calcule les indicateurs
+# - le copie dans un segment de mémoire partagée (une version = un segment)
+# - publie un petit manifeste JSON (version, nom du segment, position de chaque colonne)
+#
+# Les clients (attach) lisent le manifeste et construisent un barres.Bars dont
+# les colonnes sont des vues NumPy en lecture seule sur le segment : aucune copie.
+#
+# Rafraîchissement atomique : la nouvelle version est écrite dans un NOUVEAU
+# segment, puis le manifeste est remplacé (os.replace). Un client voit donc
+# l'ancienne version ou la nouvelle, jamais un mélange. L'ancien segment est
+# supprimé (unlink) tout de suite : les clients qui l'ont déjà ouvert le gardent
+# jusqu'à ce qu'ils n'aient plus de vue dessus.
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from barres import Bars
+
+# Même dossier pour le serveur et les clients (modifiable par variable d'environnement)
+DOSSIER_PARTAGE = os.getenv("ROBOT_TRADING_PARTAGE",
+                            os.path.join(tempfile.gettempdir(), "robot_trading_partage"))
+_ALIGNEMENT = 64  # chaque colonne commence sur une ligne de cache
+_CREES = set()    # segments créés par un serveur de ce processus
+
+
+class _Segment(shared_memory.SharedMemory):
+    """
+    SharedMemory qui ne se ferme pas tout seul : les vues NumPy créées sur
+    .buf ne retiennent pas l'export, et close() pendant qu'elles existent
+    les ferait pointer vers de la mémoire démappée. Le mmap reste référencé
+    par les vues et est libéré avec la dernière d'entre elles.
+    """
+
+    def __del__(self):
+        pass
+
+
+def _chemin_manifeste(root, ticker, interval):
+    nom = re.sub(r'[\\/:*?"<>|]', '_', ticker)
+    return os.path.join(root, interval, f"{nom}.json")
+
+
+def _nom_segment(ticker, interval, version):
+    # Noms courts (31 caractères max sur macOS)
+    h = hashlib.sha1(f"{ticker}|{interval}".encode()).hexdigest()[:10]
+    return f"rt_{h}_v{version}"
+
+
+def _ouvrir_segment(nom):
+    """
+    Ouvre un segment existant sans le confier au resource_tracker de ce processus.
+    Le descripteur shm_open est fermé tout de suite : le mmap a le sien, et
+    _Segment ne se ferme jamais (un descripteur perdu par version sinon).
+    """
+    try:
+        segment = _Segment(name=nom, track=False)  # Python ≥ 3.13
+    except TypeError:
+        segment = _Segment(name=nom)
+        # Sinon le resource_tracker du client supprimerait le segment du serveur à sa
+        # sortie (sauf si le serveur est dans ce processus : son inscription est la même)
+        if nom not in _CREES:
+            resource_tracker.unregister(segment._name, "shared_memory")
+    if segment._fd >= 0:
+        os.close(segment._fd)
+        segment._fd = -1
+    return segment
+
+
+# ============================================================================
+# 1️⃣ SERVEUR (un seul processus écrit)
+# ============================================================================
+
+class MarketDataServer:
+    """
+    Publie des barres en mémoire partagée.
+
+    Exemple :
+        with MarketDataServer() as serveur:
+            serveur.publish("GC=F", add_indicators(Bars.from_pandas(df)))
+            ...                           # nouvelles barres
+            serveur.publish("GC=F", bars) # version suivante, remplacement atomique
+
+    Les segments sont supprimés à close() (ou par le resource_tracker si le
+    processus s'arrête brutalement).
+    """
+
+    def __init__(self, root=DOSSIER_PARTAGE):
+        self.root = root
+        self._segments = {}   # (ticker, interval) → segment publié
+        self.versions = {}    # (ticker, interval) → version publiée
+
+    def publish(self, ticker, bars, interval="1d"):
+        """
+        Copie les barres (Bars ou DataFrame) dans un nouveau segment et publie
+        la version suivante.
+
+        Returns:
+            numéro de version publié
+        """
+        if isinstance(bars, pd.DataFrame):
+            bars = Bars.from_pandas(bars)
+        cle = (ticker, interval)
+        chemin = _chemin_manifeste(self.root, ticker, interval)
+        version = self.versions.get(cle, _version_publiee(chemin)) + 1
+
+        # Disposition : dates (int64 ns) puis chaque colonne, alignées sur 64 octets
+        n = len(bars)
+        tableaux = [('__dates__', bars.dates.view(np.int64))] + [(nom, bars[nom]) for nom in bars.columns]
+        colonnes, taille = [], 0
+        for nom, valeurs in tableaux:
+            colonnes.append([nom, valeurs.dtype.str, taille])
+            taille += -(-valeurs.nbytes // _ALIGNEMENT) * _ALIGNEMENT
+
+        nom_segment = _nom_segment(ticker, interval, version)
+        try:
+            segment = shared_memory.SharedMemory(name=nom_segment, create=True, size=max(taille, 1))
+        except FileExistsError:
+            # Reste d'un serveur arrêté brutalement
+            _ouvrir_segment(nom_segment).unlink()
+            segment = shared_memory.SharedMemory(name=nom_segment, create=True, size=max(taille, 1))
+        _CREES.add(nom_segment)
+        for (nom, valeurs), (_, dtype, position) in zip(tableaux, colonnes):
+            np.ndarray(n, dtype=dtype, buffer=segment.buf, offset=position)[:] = valeurs
+
+        manifeste = {'ticker': ticker, 'interval': interval, 'version': version,
+                     'segment': nom_segment, 'n': n, 'tz': None if bars._tz is None else str(bars._tz),
+                     'columns': colonnes[1:], 'dates_offset': colonnes[0][2],
+                     'published': time.time()}
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        temporaire = chemin + ".tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(manifeste, f)
+        os.replace(temporaire, chemin)  # ← bascule atomique vers la nouvelle version
+
+        ancien = self._segments.pop(cle, None)
+        if ancien is not None:
+            _fermer(ancien)
+        self._segments[cle] = segment
+        self.versions[cle] = version
+        return version
+
+    def close(self):
+        """Retire les manifestes et supprime les segments publiés."""
+        for (ticker, interval), segment in self._segments.items():
+            chemin = _chemin_manifeste(self.root, ticker, interval)
+            if os.path.exists(chemin):
+                os.remove(chemin)
+            _fermer(segment)
+        self._segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _version_publiee(chemin):
+    """Dernière version d'un manifeste existant (redémarrage du serveur), 0 sinon."""
+    try:
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f)['version']
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def _fermer(segment):
+    _CREES.discard(segment.name)
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# ============================================================================
+# 2️⃣ CLIENTS (lecture seule, sans copie)
+# ============================================================================
+
+_ATTACHES = {}  # (root, interval, ticker) → (version, Bars)
+
+
+def attach(ticker, interval="1d", root=DOSSIER_PARTAGE):
+    """
+    Barres publiées pour un ticker, en vues lecture seule sur la mémoire partagée.
+
+    Le Bars renvoyé est partagé par tous les appels de ce processus tant que
+    la version ne change pas : ajouter des colonnes se fait sur une vue (bars[:]).
+
+    Raises:
+        FileNotFoundError : rien de publié pour ce ticker (pas de serveur)
+    """
+    chemin = _chemin_manifeste(root, ticker, interval)
+    for _ in range(3):
+        with open(chemin, encoding='utf-8') as f:
+            manifeste = json.load(f)
+        cle = (root, interval, ticker)
+        deja = _ATTACHES.get(cle)
+        if deja is not None and deja[0] == manifeste['version']:
+            return deja[1]
+        try:
+            segment = _ouvrir_segment(manifeste['segment'])
+        except FileNotFoundError:
+            # Segment remplacé entre la lecture du manifeste et l'ouverture : on relit
+            continue
+        bars = _barres(segment, manifeste)
+        _ATTACHES[cle] = (manifeste['version'], bars)
+        return bars
+    raise FileNotFoundError(f"Segment de {ticker} introuvable (serveur arrêté ?)")
+
+
+def _barres(segment, manifeste):
+    n = manifeste['n']
+
+    def vue(dtype, position):
+        tableau = np.ndarray(n, dtype=dtype, buffer=segment.buf, offset=position)
+        tableau.flags.writeable = False
+        return tableau
+
+    tz = manifeste['tz'] and pd.DatetimeTZDtype(tz=manifeste['tz']).tz
+    return Bars(vue(np.int64, manifeste['dates_offset']),
+                {nom: vue(dtype, position) for nom, dtype, position in manifeste['columns']}, tz=tz)
+
+
+# ============================================================================
+# 3️⃣ BOUCLE DU SERVEUR
+# ============================================================================
+
+def serve_market_data(tickers, source, interval="1d", root=DOSSIER_PARTAGE, refresh=60.0,
+                      iterations=None, sleep=time.sleep):
+    """
+    Publie les barres + indicateurs de chaque ticker, puis toutes les `refresh`
+    secondes recharge la source et republie les tickers dont les barres ont changé.
+
+    Args:
+        source : objet avec fetch(ticker) (ingestion.YahooSource, StoreSource, FixtureSource)
+        iterations : nombre de passes (None = jusqu'à Ctrl+C)
+    """
+    from donnees import add_indicators, normalize_ohlcv
+    from resultats import data_hash
+
+    empreintes = {}
+    with MarketDataServer(root) as serveur:
+        passe = 0
+        try:
+            while iterations is None or passe < iterations:
+                for ticker in tickers:
+                    try:
+                        df = normalize_ohlcv(source.fetch(ticker), ticker)
+                    except Exception as e:
+                        print(f"  ⚠️ {ticker} : {type(e).__name__}: {e}")
+                        continue
+                    if df.empty:
+                        continue
+                    empreinte = data_hash(df)
+                    if empreintes.get(ticker) == empreinte:
+                        continue
+                    bars = add_indicators(Bars.from_pandas(df))
+                    version = serveur.publish(ticker, bars, interval=interval)
+                    empreintes[ticker] = empreinte
+                    print(f"  📡 {ticker} v{version} : {len(bars)} barres publiées")
+                passe += 1
+                if iterations is None or passe < iterations:
+                    sleep(refresh)
+        except KeyboardInterrupt:
+            print("\n⏹️ Serveur arrêté.")
+        return dict(serveur.versions)
+
+
+# ============================================================================
+# ZONE DE TEST
+# ============================================================================
+
+_CLIENT_TEST = """
+import json, sys, time
+from partage import attach
+t = time.perf_counter()
+bars = attach("TEST", root=sys.argv[1])
+print(json.dumps({'attach_ms': round((time.perf_counter() - t) * 1e3, 2), 'n': len(bars),
+                  'close': float(bars['Close'][-1]), 'lecture_seule': not bars['Close'].flags.writeable}))
+"""
+
+
+if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    from backtest import FibonacciBacktester
+    from donnees import add_indicators, calculate_fibonacci
+
+    print("🧪 TEST PARTAGE.PY")
+    print("=" * 60)
+
+    n = 1_000_000
+    dates = pd.date_range("2020-01-01", periods=n, freq="min", name="Date")
+    prix = 2000 + np.cumsum(np.random.normal(0, 1, n))
+    df = pd.DataFrame({'Open': prix, 'High': prix + 1, 'Low': prix - 1,
+                       'Close': prix, 'Volume': 1000.0}, index=dates)
+    bars = add_indicators(Bars.from_pandas(df))
+    root = tempfile.mkdtemp()
+
+    with MarketDataServer(root) as serveur:
+        t = time.perf_counter()
+        serveur.publish("TEST", bars)
+        print(f"  publish ({n} barres, {len(bars.columns)} colonnes) : "
+              f"{(time.perf_counter() - t) * 1e3:.0f} ms")
+
+        partagees = attach("TEST", root=root)
+        print(f"  identique : {np.array_equal(partagees['RSI'], bars['RSI'], equal_nan=True)}, "
+              f"lecture seule : {not partagees['Close'].flags.writeable}")
+
+        # Clients = processus indépendants (comme des sessions Streamlit)
+        dossier = os.path.dirname(os.path.abspath(__file__))
+        clients = [subprocess.Popen([sys.executable, "-c", _CLIENT_TEST, root], cwd=dossier,
+                                    stdout=subprocess.PIPE, text=True) for _ in range(4)]
+        for p in clients:
+            print(f"  client : {p.communicate()[0].strip()}")
+
+        # Le backtester travaille sur une vue : le segment n'est jamais modifié
+        resultats = []
+        for donnees in (partagees.tail(5000), bars.tail(5000).to_pandas()):
+            tester = FibonacciBacktester(donnees)
+            tester.generate_signals(calculate_fibonacci, lookback=50)
+            tester.run_backtest()
+            resultats.append(tester.get_metrics())
+        print(f"  backtest sur les barres partagées = sur un DataFrame : {resultats[0] == resultats[1]}")
+
+        # Rafraîchissement : nouvelle version, l'ancienne reste lisible par ceux qui la tiennent
+        suite = add_indicators(Bars.from_pandas(df.iloc[:n // 2]))
+        version = serveur.publish("TEST", suite)
+        nouvelles = attach("TEST", root=root)
+        print(f"  v{version} : {len(nouvelles)} barres ; ancienne vue toujours lisible : "
+              f"{len(partagees)} barres, dernier close {partagees['Close'][-1]:.2f}")
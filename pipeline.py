@@ -0,0 +1,378 @@
+# pipeline.py - Traitement de nuit : graphe d'étapes par ticker, avec cache par hash
+#
+# Les étapes de demarrer_projet() (main.py) deviennent un graphe par ticker :
+#
+#   download ─→ indicators ─┬─→ fibonacci ─→ ai
+#                           └─→ backtest ──→ plot
+#
+# La sortie de chaque étape est stockée sous une clé = hash(étape, version,
+# paramètres, clés des entrées). Si cette clé existe déjà, l'étape est sautée
+# (et sa sortie n'est même pas relue si rien en aval n'est à recalculer).
+# Le téléchargement s'exécute toujours, mais sa clé est le hash du contenu :
+# des données inchangées rendent tout le reste de la chaîne réutilisable.
+# Exception : une réponse de repli de l'IA (pas de clé API, erreur) n'est pas
+# gardée, l'étape ai est refaite au passage suivant.
+#
+# Les tickers et les étapes indépendantes (ai / backtest) tournent en parallèle
+# dans un pool de threads : les étapes longues sont des appels réseau (Yahoo,
+# OpenAI) ou des noyaux NumPy, qui libèrent le GIL.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from donnees import add_indicators, calculate_fibonacci, normalize_ohlcv
+from ingestion import RateLimiter, YahooSource, clean_bars, fetch_with_retry
+from resultats import STRATEGY_VERSION, data_hash
+
+
+# ============================================================================
+# 1️⃣ ÉTAPES
+# ============================================================================
+# Chaque étape : fonction(contexte, entrées) → sortie. `version` est à
+# incrémenter quand le code de l'étape change (les anciennes sorties ne sont
+# alors plus réutilisées).
+
+def _download(ctx, entrees):
+    brut, _ = fetch_with_retry(ctx['source'], ctx['ticker'], ctx['limiter'],
+                               retries=ctx['retries'], backoff=ctx['backoff'])
+    return clean_bars(normalize_ohlcv(brut, ctx['ticker']))
+
+
+def _indicators(ctx, entrees):
+    # Copie : la sortie de download (gardée en mémoire) n'est pas modifiée, quel que soit pandas
+    return add_indicators(entrees['download'].copy())
+
+
+def _fibonacci(ctx, entrees):
+    levels, high, low, trend = calculate_fibonacci(entrees['indicators'], lookback=ctx['lookback'])
+    return {'levels': levels, 'high': high, 'low': low, 'trend': trend}
+
+
+def _ai(ctx, entrees):
+    df = entrees['indicators']
+    fib = entrees['fibonacci']
+    from intelligence import generate_ai_analysis
+    return generate_ai_analysis(
+        price=df['Close'].iloc[-1],
+        rsi=df['RSI'].iloc[-1],
+        macd_line=df['MACD_12_26_9'].iloc[-1],
+        macd_signal=df['MACDs_12_26_9'].iloc[-1],
+        fib_levels=fib['levels'],
+        trend=fib['trend'],
+        market=ctx['ticker']
+    )
+
+
+def _backtest(ctx, entrees):
+    from functools import partial
+    from backtest import FibonacciBacktester
+
+    tester = FibonacciBacktester(entrees['indicators'], initial_capital=ctx['initial_capital'])
+    tester.generate_signals(partial(calculate_fibonacci, lookback=ctx['lookback']), lookback=ctx['lookback'])
+    tester.run_backtest(stop_loss_pct=ctx['stop_loss_pct'], take_profit_pct=ctx['take_profit_pct'])
+    return {'metrics': tester.get_metrics(), 'trades': tester.trades,
+            'signal': tester.df['SIGNAL'].tolist(), 'portfolio': tester.df['PORTFOLIO'].tolist()}
+
+
+def _plot(ctx, entrees):
+    from backtest import plot_backtest_results
+
+    resultat = entrees['backtest']
+    df = entrees['indicators'].assign(SIGNAL=resultat['signal'], PORTFOLIO=resultat['portfolio'])
+    fig = plot_backtest_results(df, resultat['trades'], market=ctx['ticker'])
+    return fig.to_html(include_plotlyjs='cdn', full_html=True)
+
+
+ETAPES = {
+    'download':   {'fonction': _download,   'deps': (),                          'format': 'parquet',
+                   'version': '1', 'params': ('period', 'interval')},
+    'indicators': {'fonction': _indicators, 'deps': ('download',),               'format': 'parquet',
+                   'version': '1', 'params': ()},
+    'fibonacci':  {'fonction': _fibonacci,  'deps': ('indicators',),             'format': 'json',
+                   'version': '1', 'params': ('lookback',)},
+    'ai':         {'fonction': _ai,         'deps': ('indicators', 'fibonacci'), 'format': 'json',
+                   'version': '1', 'params': ('ticker',),  # le ticker est écrit dans la sortie
+                   # Mode MANUEL (pas de clé API) ou ERREUR : pas mis en cache, pour que
+                   # l'IA soit appelée dès qu'elle est disponible
+                   'garder': lambda sortie: sortie.get('mode') == 'AUTO'},
+    'backtest':   {'fonction': _backtest,   'deps': ('indicators',),             'format': 'json',
+                   'version': STRATEGY_VERSION, 'params': ('lookback', 'stop_loss_pct',
+                                                           'take_profit_pct', 'initial_capital')},
+    'plot':       {'fonction': _plot,       'deps': ('indicators', 'backtest'),  'format': 'html',
+                   'version': '1', 'params': ('ticker',)},  # titre du graphique
+}
+
+
+def _avec_dependances(etapes):
+    """Étapes demandées + toutes leurs dépendances, dans l'ordre de ETAPES."""
+    voulues = set()
+    a_voir = list(etapes)
+    while a_voir:
+        etape = a_voir.pop()
+        if etape not in ETAPES:
+            raise ValueError(f"Étape inconnue : {etape}")
+        if etape not in voulues:
+            voulues.add(etape)
+            a_voir.extend(ETAPES[etape]['deps'])
+    return [e for e in ETAPES if e in voulues]
+
+
+# ============================================================================
+# 2️⃣ CACHE DES SORTIES
+# ============================================================================
+
+class StageCache:
+    """Sorties d'étapes sur disque : root/<étape>/<clé>.<format> (écriture atomique)."""
+
+    def __init__(self, root="pipeline"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, etape, cle):
+        return os.path.join(self.root, etape, f"{cle}.{ETAPES[etape]['format']}")
+
+    def exists(self, etape, cle):
+        return os.path.exists(self.path(etape, cle))
+
+    def write(self, etape, cle, sortie):
+        chemin = self.path(etape, cle)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        temporaire = f"{chemin}.{threading.get_ident()}.tmp"
+        format_ = ETAPES[etape]['format']
+        if format_ == 'parquet':
+            sortie.to_parquet(temporaire)
+        else:
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                if format_ == 'json':
+                    json.dump(sortie, f, default=_json_defaut, ensure_ascii=False)
+                else:
+                    f.write(sortie)
+        os.replace(temporaire, chemin)
+
+    def read(self, etape, cle):
+        chemin = self.path(etape, cle)
+        format_ = ETAPES[etape]['format']
+        if format_ == 'parquet':
+            return pd.read_parquet(chemin)
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f) if format_ == 'json' else f.read()
+
+
+def _json_defaut(valeur):
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    return str(valeur)
+
+
+def stage_key(etape, params, cles_entrees):
+    """Clé d'une sortie : hash(étape, version, paramètres de l'étape, clés des entrées)."""
+    # 2 et 2.0 doivent donner la même clé (comme resultats.run_key)
+    valeurs = {p: float(params[p]) if isinstance(params[p], (int, float)) else params[p]
+               for p in ETAPES[etape]['params']}
+    payload = json.dumps({'etape': etape, 'version': ETAPES[etape]['version'],
+                          'params': valeurs,
+                          'entrees': cles_entrees}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# ============================================================================
+# 3️⃣ ORDONNANCEUR
+# ============================================================================
+
+class _Ticker:
+    """État d'un ticker pendant l'exécution : clés et sorties déjà chargées."""
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.cles = {}
+        self.sorties = {}
+        self.verrou = threading.Lock()
+
+
+def _charger(cache, etat, etape):
+    """Sortie d'une étape (mémoire, sinon disque) ; une seule lecture par ticker."""
+    with etat.verrou:
+        if etape not in etat.sorties:
+            etat.sorties[etape] = cache.read(etape, etat.cles[etape])
+        return etat.sorties[etape]
+
+
+def _executer(cache, ctx, etat, etape, force):
+    """Exécute (ou saute) une étape d'un ticker. Retourne (statut, clé, secondes)."""
+    debut = time.perf_counter()
+    spec = ETAPES[etape]
+
+    if etape == 'download':
+        sortie = spec['fonction'](ctx, {})
+        cle = f"{data_hash(sortie)}-{ctx['interval']}"
+        statut = 'unchanged' if cache.exists(etape, cle) else 'computed'
+        if statut == 'computed':
+            cache.write(etape, cle, sortie)
+        with etat.verrou:
+            etat.cles[etape] = cle
+            etat.sorties[etape] = sortie
+        return statut, cle, time.perf_counter() - debut
+
+    cle = stage_key(etape, ctx, [etat.cles[d] for d in spec['deps']])
+    with etat.verrou:
+        etat.cles[etape] = cle
+    if not force and cache.exists(etape, cle):
+        return 'reused', cle, time.perf_counter() - debut
+
+    entrees = {d: _charger(cache, etat, d) for d in spec['deps']}
+    sortie = spec['fonction'](ctx, entrees)
+    if spec.get('garder', lambda _: True)(sortie):
+        cache.write(etape, cle, sortie)
+    if ETAPES[etape]['format'] == 'json':
+        sortie = json.loads(json.dumps(sortie, default=_json_defaut))  # même forme que relue du disque
+    with etat.verrou:
+        etat.sorties[etape] = sortie
+    return 'computed', cle, time.perf_counter() - debut
+
+
+def run_pipeline(tickers, root="pipeline", source=None, workers=8, rate=5.0, retries=3,
+                 backoff=1.0, stages=None, force=False, period="1y", interval="1d", lookback=50,
+                 stop_loss_pct=2.0, take_profit_pct=5.0, initial_capital=10000):
+    """
+    Exécute le graphe d'étapes pour chaque ticker.
+
+    Args:
+        tickers : liste de symboles
+        root : dossier du cache des sorties (+ manifestes et résumé d'exécution)
+        source : source de données (défaut YahooSource(period, interval)) ; voir ingestion.py
+        workers : taille du pool (tickers et étapes indépendantes en parallèle)
+        rate : téléchargements par seconde maximum (0 = illimité)
+        retries, backoff : nouvelles tentatives du téléchargement (voir fetch_with_retry)
+        stages : étapes voulues (défaut : toutes) ; leurs dépendances sont ajoutées
+        force : recalcule même si la sortie existe déjà
+
+    Returns:
+        dict : tickers {ticker: {étape: {'status', 'key', 'seconds', 'error'}}},
+               totals {statut: nombre}, stages {étape: secondes cumulées}, seconds
+    """
+    cache = StageCache(root)
+    etapes = _avec_dependances(stages or ETAPES)
+    params = {'period': period, 'interval': interval, 'lookback': lookback,
+              'stop_loss_pct': stop_loss_pct, 'take_profit_pct': take_profit_pct,
+              'initial_capital': initial_capital}
+    communs = {'source': source or YahooSource(period, interval), 'limiter': RateLimiter(rate),
+               'retries': retries, 'backoff': backoff, **params}
+
+    tickers = list(dict.fromkeys(tickers))
+    etats = {t: _Ticker(t) for t in tickers}
+    resultats = {t: {} for t in tickers}
+    debut = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        en_cours = {}
+
+        def soumettre():
+            for t in tickers:
+                for etape in etapes:
+                    if etape in resultats[t] or (t, etape) in en_cours.values():
+                        continue
+                    deps = ETAPES[etape]['deps']
+                    if any(resultats[t].get(d, {}).get('status') in ('failed', 'skipped') for d in deps):
+                        resultats[t][etape] = {'status': 'skipped', 'key': None, 'seconds': 0.0,
+                                               'error': "dépendance en échec"}
+                    elif all(d in resultats[t] for d in deps):
+                        ctx = {**communs, 'ticker': t}
+                        futur = pool.submit(_executer, cache, ctx, etats[t], etape, force)
+                        en_cours[futur] = (t, etape)
+
+        soumettre()
+        while en_cours:
+            finis, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in finis:
+                t, etape = en_cours.pop(futur)
+                try:
+                    statut, cle, secondes = futur.result()
+                    resultats[t][etape] = {'status': statut, 'key': cle,
+                                           'seconds': round(secondes, 3), 'error': None}
+                except Exception as e:
+                    resultats[t][etape] = {'status': 'failed', 'key': None, 'seconds': 0.0,
+                                           'error': f"{type(e).__name__}: {e}"}
+            soumettre()
+
+    resume = _resumer(resultats, etapes, time.perf_counter() - debut)
+    _ecrire_manifestes(cache, resultats, resume)
+    return resume
+
+
+def _resumer(resultats, etapes, secondes):
+    totaux = {}
+    par_etape = {e: {'seconds': 0.0, 'computed': 0, 'reused': 0} for e in etapes}
+    for etapes_ticker in resultats.values():
+        for etape, r in etapes_ticker.items():
+            totaux[r['status']] = totaux.get(r['status'], 0) + 1
+            par_etape[etape]['seconds'] = round(par_etape[etape]['seconds'] + r['seconds'], 3)
+            if r['status'] == 'computed':
+                par_etape[etape]['computed'] += 1
+            elif r['status'] in ('reused', 'unchanged'):  # unchanged : téléchargé, déjà en cache
+                par_etape[etape]['reused'] += 1
+    return {'created_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(secondes, 3), 'totals': totaux, 'stages': par_etape,
+            'tickers': resultats}
+
+
+def _ecrire_manifestes(cache, resultats, resume):
+    """root/manifestes/<ticker>.json : clé de la dernière sortie de chaque étape."""
+    dossier = os.path.join(cache.root, "manifestes")
+    os.makedirs(dossier, exist_ok=True)
+    for ticker, etapes in resultats.items():
+        manifeste = {etape: {'key': r['key'], 'path': cache.path(etape, r['key'])}
+                     for etape, r in etapes.items() if r['key'] is not None}
+        with open(os.path.join(dossier, ticker.replace('/', '_') + ".json"), 'w', encoding='utf-8') as f:
+            json.dump(manifeste, f, indent=1)
+    with open(os.path.join(cache.root, "derniere_execution.json"), 'w', encoding='utf-8') as f:
+        json.dump(resume, f, indent=1)
+
+
+def print_pipeline_summary(resume):
+    """Résumé console : recalculé / réutilisé par étape, temps cumulés, erreurs."""
+    print("\n" + "=" * 70)
+    print("🌙 PIPELINE DE NUIT".center(70))
+    print("=" * 70)
+    print(f"  {'Étape':12s} {'Recalculées':>12s} {'Réutilisées':>12s} {'Temps (s)':>12s}")
+    for etape, s in resume['stages'].items():
+        print(f"  {etape:12s} {s['computed']:>12d} {s['reused']:>12d} {s['seconds']:>12.3f}")
+    print("-" * 70)
+    totaux = ", ".join(f"{statut}={n}" for statut, n in sorted(resume['totals'].items()))
+    print(f"  Total : {totaux} | durée : {resume['seconds']:.2f} s")
+    for ticker, etapes in resume['tickers'].items():
+        for etape, r in etapes.items():
+            if r['status'] == 'failed':
+                print(f"  ❌ {ticker} / {etape} : {r['error']}")
+    print("=" * 70 + "\n")
+
+
+# ============================================================================
+# 4️⃣ ZONE DE TEST (hors ligne)
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+    from ingestion import FixtureSource
+
+    print("🧪 TEST PIPELINE.PY (fixtures locales)")
+    dossier = tempfile.mkdtemp()
+    fixtures = os.path.join(dossier, "fixtures")
+    os.makedirs(fixtures)
+    dates = pd.date_range("2024-01-01", periods=250, freq="B", name="Date")
+    for t in ["GC=F", "^NDX", "SI=F"]:
+        prix = 2000 * np.exp(np.cumsum(np.random.normal(0, 0.01, len(dates))))
+        pd.DataFrame({'Open': prix, 'High': prix * 1.005, 'Low': prix * 0.995, 'Close': prix,
+                      'Volume': 1000.0}, index=dates).to_parquet(os.path.join(fixtures, f"{t}.parquet"))
+
+    for passage in ("1er passage", "2e passage (rien n'a changé)"):
+        print(f"\n--- {passage} ---")
+        print_pipeline_summary(run_pipeline(["GC=F", "^NDX", "SI=F"], root=os.path.join(dossier, "cache"),
+                                            source=FixtureSource(fixtures), rate=0))
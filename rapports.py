@@ -0,0 +1,296 @@
+# rapports.py - Génération de rapports HTML pour des milliers de runs
+#
+# À partir du store de résultats (resultats.py) :
+#   rapport/
+#     index.html            tableau récapitulatif (un lien par run)
+#     assets/plotly.min.js  UNE seule copie de Plotly pour toutes les pages
+#     assets/style.css
+#     runs/<run_id>.html    métriques, courbe d'équité et trades du run
+#
+# Les séries sont pré-réduites (min/max par tranche) avant d'être écrites, et
+# les pages sont générées en parallèle (un processus par cœur).
+
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from resultats import METRIC_COLUMNS, ResultStore
+
+_STYLE = """
+body { font-family: sans-serif; background: #111; color: #ddd; margin: 2em; }
+a { color: #6cf; }
+table { border-collapse: collapse; font-size: 13px; }
+th, td { padding: 4px 8px; border-bottom: 1px solid #333; text-align: right; }
+th { cursor: pointer; position: sticky; top: 0; background: #222; }
+td.txt, th.txt { text-align: left; }
+.pos { color: #4c4; } .neg { color: #e55; }
+#graphique { height: 520px; }
+"""
+
+# Tri des colonnes du tableau récapitulatif, sans dépendance
+_TRI_JS = """
+document.querySelectorAll('th').forEach(function (th, i) {
+  th.onclick = function () {
+    var tbody = th.closest('table').tBodies[0];
+    var lignes = Array.from(tbody.rows), sens = th.dataset.sens === '1' ? -1 : 1;
+    th.dataset.sens = sens === 1 ? '1' : '-1';
+    lignes.sort(function (a, b) {
+      var x = a.cells[i].dataset.v || a.cells[i].textContent, y = b.cells[i].dataset.v || b.cells[i].textContent;
+      var nx = parseFloat(x), ny = parseFloat(y);
+      return (isNaN(nx) || isNaN(ny) ? x.localeCompare(y) : nx - ny) * sens;
+    });
+    lignes.forEach(function (l) { tbody.appendChild(l); });
+  };
+});
+"""
+
+_LIBELLES = {
+    'total_trades': 'Trades', 'win_rate': 'Win Rate (%)', 'profit_factor': 'Profit Factor',
+    'max_drawdown': 'Max DD (%)', 'sharpe_ratio': 'Sharpe', 'total_return': 'Retour (%)',
+    'avg_win': 'Gain moyen', 'avg_loss': 'Perte moyenne', 'risk_reward_ratio': 'Risque/Récompense',
+}
+
+
+# ============================================================================
+# 1️⃣ RÉDUCTION DES SÉRIES
+# ============================================================================
+
+def downsample_minmax(y, n_points=800):
+    """
+    Indices à garder pour tracer `y` avec environ `n_points` points.
+
+    On découpe la série en n_points/2 tranches et on garde le min et le max de
+    chaque tranche : les pics et les creux (drawdowns) restent visibles.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_points:
+        return np.arange(n)
+
+    taille = -(-n // max(1, n_points // 2))
+    tranches = -(-n // taille)
+    # La dernière tranche est complétée avec la dernière valeur
+    complet = np.full(tranches * taille, y[-1])
+    complet[:n] = y
+    blocs = complet.reshape(tranches, taille)
+
+    decalage = np.arange(tranches) * taille
+    i_min = np.argmin(blocs, axis=1) + decalage
+    i_max = np.argmax(blocs, axis=1) + decalage
+    garde = np.unique(np.concatenate([[0, n - 1], i_min, i_max]))
+    return garde[garde < n]
+
+
+# ============================================================================
+# 2️⃣ RENDU HTML
+# ============================================================================
+
+def _format(valeur):
+    if isinstance(valeur, float):
+        return f"{valeur:.2f}"
+    return html.escape(str(valeur))
+
+
+def _classe(valeur):
+    if isinstance(valeur, (int, float)) and valeur != 0:
+        return ' class="pos"' if valeur > 0 else ' class="neg"'
+    return ''
+
+
+def _page(titre, corps, prefixe, avec_plotly=False):
+    scripts = f'<script src="{prefixe}assets/plotly.min.js"></script>' if avec_plotly else ''
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(titre)}</title>'
+            f'<link rel="stylesheet" href="{prefixe}assets/style.css">{scripts}</head>'
+            f'<body>{corps}</body></html>')
+
+
+def render_run(root, run, out_dir, n_points=800):
+    """
+    Écrit la page d'un run (appelée dans les processus de travail).
+
+    Args:
+        root : dossier du ResultStore (pour relire equity/trades en Parquet)
+        run : ligne de la table runs (dict)
+
+    Returns:
+        (chemin, taille en octets)
+    """
+    import pyarrow.parquet as pq
+
+    run_id = run['run_id']
+    # Lecture directe en tableaux NumPy (sans passer par un DataFrame)
+    equity = pq.read_table(os.path.join(root, "equity", f"{run_id}.parquet"))
+    trades = pd.read_parquet(os.path.join(root, "trades", f"{run_id}.parquet"))
+
+    dates = equity.column('Date').to_numpy()
+    portfolio = equity.column('PORTFOLIO').to_numpy()
+    garde = downsample_minmax(portfolio, n_points)
+    dates = dates[garde]
+    # Unité la plus courte qui ne perd rien (jour, seconde, sinon milliseconde)
+    unite = next((u for u in ('D', 's') if (dates.astype(f'datetime64[{u}]') == dates).all()), 'ms')
+    series = {
+        'x': np.datetime_as_string(dates, unit=unite).tolist(),
+        'prix': np.round(equity.column('Close').to_numpy()[garde], 2).tolist(),
+        'equite': np.round(portfolio[garde], 2).tolist(),
+    }
+    # L'axe x n'est écrit qu'une fois, partagé par les deux courbes
+    donnees = ("[{x: S.x, y: S.prix, name: 'Prix Close', type: 'scatter', "
+               "line: {color: 'royalblue', width: 1.5}}, "
+               "{x: S.x, y: S.equite, name: 'Portfolio', type: 'scatter', yaxis: 'y2', "
+               "line: {color: 'purple', width: 2, dash: 'dash'}}]")
+    mise_en_page = {
+        'template': 'plotly_dark', 'paper_bgcolor': '#111', 'plot_bgcolor': '#111',
+        'font': {'color': '#ddd'}, 'hovermode': 'x unified', 'margin': {'t': 30},
+        'yaxis': {'title': 'Prix ($)'},
+        'yaxis2': {'title': 'Portfolio ($)', 'overlaying': 'y', 'side': 'right'},
+    }
+
+    metriques = "".join(f"<tr><td class='txt'>{_LIBELLES[k]}</td><td{_classe(run[k])}>{_format(run[k])}</td></tr>"
+                        for k in METRIC_COLUMNS)
+    parametres = json.loads(run['params'])
+    params_html = " · ".join(f"{html.escape(k)} = {_format(v)}" for k, v in sorted(parametres.items()))
+
+    lignes_trades = ""
+    if len(trades):
+        for t in trades.itertuples(index=False):
+            lignes_trades += (f"<tr><td class='txt'>{_format(t.date)}</td><td class='txt'>{_format(t.exit_reason)}</td>"
+                              f"<td>{t.entry_price:.2f}</td><td>{t.exit_price:.2f}</td>"
+                              f"<td{_classe(t.pnl)}>{t.pnl:.2f}</td><td{_classe(t.pnl_pct)}>{t.pnl_pct:.2f}</td></tr>")
+
+    corps = (
+        f"<p><a href='../index.html'>← Tous les runs</a></p>"
+        f"<h2>🎯 {html.escape(str(run['ticker']))} — run {html.escape(run_id)}</h2>"
+        f"<p>{params_html}<br>Période : {_format(run['start_date'])} → {_format(run['end_date'])} ({run['n_bars']} barres)</p>"
+        f"<table>{metriques}</table>"
+        f"<div id='graphique'></div>"
+        f"<h3>Trades ({len(trades)})</h3>"
+        f"<table><thead><tr><th class='txt'>Sortie</th><th class='txt'>Raison</th><th>Entrée</th>"
+        f"<th>Sortie</th><th>PnL</th><th>PnL %</th></tr></thead><tbody>{lignes_trades}</tbody></table>"
+        f"<script>var S = {json.dumps(series, separators=(',', ':'))};\n"
+        f"Plotly.newPlot('graphique', {donnees}, {json.dumps(mise_en_page)}, {{responsive: true}});</script>"
+    )
+
+    chemin = os.path.join(out_dir, "runs", f"{run_id}.html")
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(_page(f"Run {run_id}", corps, "../", avec_plotly=True))
+    return chemin, os.path.getsize(chemin)
+
+
+def _render_lot(root, runs, out_dir, n_points):
+    """Rend plusieurs runs dans un même processus (moins de transferts entre processus)."""
+    return [render_run(root, run, out_dir, n_points) for run in runs]
+
+
+def render_index(runs, out_dir, titre="Rapport de backtests"):
+    """Écrit index.html : une ligne par run, colonnes triables."""
+    entetes = ("<th class='txt'>Run</th><th class='txt'>Ticker</th><th>Lookback</th><th>SL %</th><th>TP %</th>"
+               + "".join(f"<th>{_LIBELLES[k]}</th>" for k in METRIC_COLUMNS))
+    lignes = []
+    for run in runs.to_dict(orient='records'):
+        cellules = "".join(f"<td{_classe(run[k])}>{_format(run[k])}</td>" for k in METRIC_COLUMNS)
+        lignes.append(
+            f"<tr><td class='txt'><a href='runs/{run['run_id']}.html'>{run['run_id'][:10]}</a></td>"
+            f"<td class='txt'>{_format(run['ticker'])}</td><td>{_format(run['lookback'])}</td>"
+            f"<td>{_format(run['stop_loss_pct'])}</td><td>{_format(run['take_profit_pct'])}</td>{cellules}</tr>"
+        )
+    corps = (f"<h1>📊 {html.escape(titre)}</h1><p>{len(runs)} runs — cliquer sur un en-tête pour trier.</p>"
+             f"<table><thead><tr>{entetes}</tr></thead><tbody>{''.join(lignes)}</tbody></table>"
+             f"<script>{_TRI_JS}</script>")
+    chemin = os.path.join(out_dir, "index.html")
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(_page(titre, corps, ""))
+    return chemin
+
+
+def _ecrire_assets(out_dir):
+    """Copie Plotly une seule fois pour tout le rapport."""
+    assets = os.path.join(out_dir, "assets")
+    os.makedirs(assets, exist_ok=True)
+    js = os.path.join(assets, "plotly.min.js")
+    if not os.path.exists(js):
+        from plotly.offline import get_plotlyjs
+        with open(js, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+    with open(os.path.join(assets, "style.css"), 'w', encoding='utf-8') as f:
+        f.write(_STYLE)
+
+
+# ============================================================================
+# 3️⃣ GÉNÉRATION EN LOT
+# ============================================================================
+
+def generate_batch_report(store_root="resultats", out_dir="rapport", ticker=None,
+                          metric="sharpe_ratio", limit=1000, n_points=800, workers=None,
+                          titre="Rapport de backtests"):
+    """
+    Génère le rapport complet pour les `limit` meilleurs runs du store.
+
+    Returns:
+        dict : runs, fichiers, octets (pages de runs + index, hors Plotly), secondes
+    """
+    debut = time.perf_counter()
+    store = ResultStore(store_root)
+    runs = store.top(metric, ticker=ticker, limit=limit)
+    store.close()
+
+    os.makedirs(os.path.join(out_dir, "runs"), exist_ok=True)
+    _ecrire_assets(out_dir)
+
+    lignes = runs.to_dict(orient='records')
+    workers = workers or os.cpu_count() or 1
+    taille_lot = max(1, -(-len(lignes) // (workers * 4)))
+    lots = [lignes[i:i + taille_lot] for i in range(0, len(lignes), taille_lot)]
+
+    pages = []
+    if workers == 1 or len(lots) <= 1:
+        for lot in lots:
+            pages.extend(_render_lot(store_root, lot, out_dir, n_points))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for resultat in pool.map(_render_lot, [store_root] * len(lots), lots,
+                                     [out_dir] * len(lots), [n_points] * len(lots)):
+                pages.extend(resultat)
+
+    index = render_index(runs, out_dir, titre=titre)
+    return {
+        'runs': len(pages),
+        'index': index,
+        'octets': sum(taille for _, taille in pages) + os.path.getsize(index),
+        'secondes': round(time.perf_counter() - debut, 2),
+    }
+
+
+# ============================================================================
+# 4️⃣ ZONE DE TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("🧪 TEST RAPPORTS.PY")
+    print("=" * 60)
+
+    dossier = tempfile.mkdtemp()
+    store = ResultStore(os.path.join(dossier, "resultats"))
+    dates = pd.date_range("2015-01-01", periods=2500, freq="B", name="Date")
+    rng = np.random.default_rng(0)
+    for i in range(1000):
+        prix = 2000 + np.cumsum(rng.normal(0, 5, len(dates)))
+        df = pd.DataFrame({'Close': prix, 'PORTFOLIO': 10000 + np.cumsum(rng.normal(0, 20, len(dates)))},
+                          index=dates)
+        trades = [{'exit_idx': 10, 'entry_price': 2000.0, 'exit_price': 2040.0, 'pnl': 190.0,
+                   'pnl_pct': 2.0, 'exit_reason': 'TAKE PROFIT', 'date': dates[10], 'exit_capital': 10190.0}]
+        metrics = {k: float(rng.normal()) for k in METRIC_COLUMNS}
+        params = {'lookback': 20 + i % 80, 'stop_loss_pct': 2.0, 'take_profit_pct': 5.0, 'initial_capital': 10000}
+        store.save(f"run{i:05d}", "GC=F", "test", params, metrics, trades, df)
+    store.close()
+
+    resume = generate_batch_report(os.path.join(dossier, "resultats"), os.path.join(dossier, "rapport"))
+    print(f"  {resume['runs']} pages en {resume['secondes']} s, "
+          f"{resume['octets'] / 1e6:.1f} Mo (hors plotly.min.js partagé)")
+    print(f"  → {resume['index']}")
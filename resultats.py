@@ -0,0 +1,230 @@
+# resultats.py - Stockage local des résultats de backtest
+#
+# - SQLite  : une ligne par run (paramètres + métriques), indexée pour les requêtes
+# - Parquet : trades et courbe d'équité de chaque run (un fichier par run)
+#
+# Chaque run est identifié par un hash du contenu : version des données +
+# stratégie + paramètres. Un run identique est relu depuis le store au lieu
+# d'être recalculé.
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+# À incrémenter quand la logique de FibonacciBacktester change :
+# les anciens résultats ne seront plus réutilisés.
+STRATEGY_VERSION = "fibonacci-v1"
+
+METRIC_COLUMNS = [
+    'total_trades', 'win_rate', 'profit_factor', 'max_drawdown', 'sharpe_ratio',
+    'total_return', 'avg_win', 'avg_loss', 'risk_reward_ratio'
+]
+
+PARAM_COLUMNS = ['lookback', 'stop_loss_pct', 'take_profit_pct', 'initial_capital']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            TEXT PRIMARY KEY,
+    ticker            TEXT,
+    strategy          TEXT NOT NULL,
+    data_hash         TEXT NOT NULL,
+    lookback          INTEGER,
+    stop_loss_pct     REAL,
+    take_profit_pct   REAL,
+    initial_capital   REAL,
+    params            TEXT NOT NULL,
+    n_bars            INTEGER,
+    start_date        TEXT,
+    end_date          TEXT,
+    created_at        TEXT NOT NULL,
+    total_trades      INTEGER,
+    win_rate          REAL,
+    profit_factor     REAL,
+    max_drawdown      REAL,
+    sharpe_ratio      REAL,
+    total_return      REAL,
+    avg_win           REAL,
+    avg_loss          REAL,
+    risk_reward_ratio REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ticker_sharpe   ON runs (ticker, sharpe_ratio DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_ticker_return   ON runs (ticker, total_return DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_ticker_lookback ON runs (ticker, lookback, sharpe_ratio DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_data_hash       ON runs (data_hash);
+"""
+
+
+# ============================================================================
+# 1️⃣ HASH DE CONTENU
+# ============================================================================
+
+def data_hash(df):
+    """Hash du contenu d'un DataFrame (index + valeurs) = version des données."""
+    h = hashlib.sha256()
+    h.update(",".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def run_key(ticker, data_version, strategy, params):
+    """
+    Identifiant d'un run : hash(ticker, données, stratégie, paramètres triés).
+    Le ticker en fait partie : deux symboles aux données identiques ont chacun leur run.
+    """
+    # 10000 et 10000.0 doivent donner la même clé
+    params = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+              for k, v in params.items()}
+    payload = json.dumps({'ticker': ticker, 'data': data_version, 'strategy': strategy,
+                          'params': params},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# ============================================================================
+# 2️⃣ STORE
+# ============================================================================
+
+class ResultStore:
+    """
+    Store local des runs de backtest.
+
+    Exemple :
+        store = ResultStore("resultats")
+        run_id, metrics, cached = store.run_or_load(df, "GC=F", lookback=50)
+        store.top("sharpe_ratio", ticker="GC=F", lookback=(30, 80), limit=20)
+    """
+
+    def __init__(self, root="resultats"):
+        self.root = root
+        os.makedirs(os.path.join(root, "trades"), exist_ok=True)
+        os.makedirs(os.path.join(root, "equity"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "runs.sqlite"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _path(self, kind, run_id):
+        return os.path.join(self.root, kind, f"{run_id}.parquet")
+
+    # --- Écriture ---------------------------------------------------------
+
+    def save(self, run_id, ticker, data_version, params, metrics, trades, df,
+             strategy=STRATEGY_VERSION):
+        """
+        Enregistre un run.
+
+        Args:
+            trades : liste de dicts (FibonacciBacktester.trades)
+            df : DataFrame du backtester (avec la colonne PORTFOLIO)
+        """
+        pd.DataFrame(trades).to_parquet(self._path("trades", run_id))
+        df[['Close', 'PORTFOLIO']].rename_axis('Date').to_parquet(self._path("equity", run_id))
+
+        row = {
+            'run_id': run_id,
+            'ticker': ticker,
+            'strategy': strategy,
+            'data_hash': data_version,
+            'params': json.dumps(params, sort_keys=True),
+            'n_bars': len(df),
+            'start_date': str(df.index[0]) if len(df) else None,
+            'end_date': str(df.index[-1]) if len(df) else None,
+            'created_at': datetime.now().isoformat(),
+        }
+        row.update({k: params.get(k) for k in PARAM_COLUMNS})
+        row.update({k: float(metrics[k]) for k in METRIC_COLUMNS})
+
+        cols = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self.conn:
+            self.conn.execute(f"INSERT OR REPLACE INTO runs ({cols}) VALUES ({marks})",
+                              list(row.values()))
+
+    # --- Lecture ------------------------------------------------------------
+
+    def get(self, run_id):
+        """Retourne la ligne du run (dict) ou None."""
+        row = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def metrics(self, run_id):
+        row = self.get(run_id)
+        if row is None:
+            return None
+        metrics = {k: row[k] for k in METRIC_COLUMNS}
+        metrics['total_trades'] = int(metrics['total_trades'])
+        return metrics
+
+    def load_trades(self, run_id):
+        return pd.read_parquet(self._path("trades", run_id))
+
+    def load_equity(self, run_id):
+        return pd.read_parquet(self._path("equity", run_id))
+
+    def top(self, metric="sharpe_ratio", ticker=None, limit=20, ascending=False, **ranges):
+        """
+        Meilleurs runs selon une métrique.
+
+        Args:
+            metric : colonne de tri (une des METRIC_COLUMNS)
+            ticker : filtre optionnel sur le symbole
+            ranges : bornes incluses sur les paramètres, ex: lookback=(30, 80)
+
+        Returns:
+            DataFrame des runs triés
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Métrique inconnue : {metric}")
+
+        where, values = [], []
+        if ticker is not None:
+            where.append("ticker = ?")
+            values.append(ticker)
+        for col, (low, high) in ranges.items():
+            if col not in PARAM_COLUMNS:
+                raise ValueError(f"Paramètre inconnu : {col}")
+            where.append(f"{col} BETWEEN ? AND ?")
+            values.extend([low, high])
+
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {metric} {'ASC' if ascending else 'DESC'} LIMIT ?"
+        values.append(int(limit))
+        return pd.read_sql_query(sql, self.conn, params=values)
+
+    # --- Mémoïsation ----------------------------------------------------------
+
+    def run_or_load(self, df, ticker, lookback=50, stop_loss_pct=2.0, take_profit_pct=5.0,
+                    initial_capital=10000, data_version=None):
+        """
+        Lance un backtest Fibonacci, ou relit le résultat s'il existe déjà.
+
+        Returns:
+            (run_id, metrics, cached)
+        """
+        params = {'lookback': lookback, 'stop_loss_pct': stop_loss_pct,
+                  'take_profit_pct': take_profit_pct, 'initial_capital': initial_capital}
+        data_version = data_version or data_hash(df)
+        run_id = run_key(ticker, data_version, STRATEGY_VERSION, params)
+
+        metrics = self.metrics(run_id)
+        if metrics is not None:
+            return run_id, metrics, True
+
+        from functools import partial
+        from donnees import calculate_fibonacci
+        from backtest import FibonacciBacktester
+
+        tester = FibonacciBacktester(df, initial_capital=initial_capital)
+        tester.generate_signals(partial(calculate_fibonacci, lookback=lookback), lookback=lookback)
+        tester.run_backtest(stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct)
+        metrics = tester.get_metrics()
+        self.save(run_id, ticker, data_version, params, metrics, tester.trades, tester.df)
+        return run_id, metrics, False
@@ -0,0 +1,296 @@
+# simulateur.py - Flux de marché local et test de charge du moteur temps réel
+#
+# Serveur : rejoue des barres (BarStore) ou des ticks synthétiques sur un socket
+# Unix (ou TCP), à une vitesse donnée (barres/seconde, tous symboles confondus).
+#
+# Protocole : une ligne JSON d'en-tête {"symbols": [...], "record_size": N},
+# puis des enregistrements binaires de taille fixe (RECORD_DTYPE). Le champ
+# `sent_ns` est l'heure d'envoi (time.monotonic_ns) pour mesurer la latence.
+#
+# Client / test de charge : pour chaque barre reçue, on exécute la chaîne
+# indicateurs → Fibonacci → signal → simulation (StreamingBacktester, un par
+# symbole) et on mesure la latence bout en bout et le débit.
+
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+
+import numpy as np
+
+RECORD_DTYPE = np.dtype([
+    ('symbol', '<u2'), ('seq', '<u4'), ('ts', '<f8'),
+    ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<f8'),
+    ('sent_ns', '<i8'),
+])
+
+
+# ============================================================================
+# 1️⃣ SOURCES DE BARRES
+# ============================================================================
+
+def synthetic_bars(n_symbols=10, n_bars=10_000, seed=0):
+    """
+    Barres synthétiques (marche aléatoire géométrique) entrelacées par date.
+
+    Returns:
+        (liste des symboles, tableau RECORD_DTYPE trié par date puis symbole)
+    """
+    rng = np.random.default_rng(seed)
+    rendements = rng.normal(0, 0.01, (n_bars, n_symbols))
+    close = 100 * np.exp(np.cumsum(rendements, axis=0))
+    ecart = np.abs(rng.normal(0, 0.005, (n_bars, n_symbols))) * close
+
+    barres = np.zeros(n_bars * n_symbols, dtype=RECORD_DTYPE)
+    barres['symbol'] = np.tile(np.arange(n_symbols), n_bars)
+    barres['seq'] = np.repeat(np.arange(n_bars), n_symbols)
+    barres['ts'] = 1.7e9 + np.repeat(np.arange(n_bars) * 60.0, n_symbols)
+    barres['close'] = close.ravel()
+    barres['open'] = np.vstack([close[:1], close[:-1]]).ravel()
+    barres['high'] = np.maximum(barres['open'], barres['close']) + ecart.ravel()
+    barres['low'] = np.minimum(barres['open'], barres['close']) - ecart.ravel()
+    barres['volume'] = rng.integers(100, 10_000, n_bars * n_symbols)
+    return [f"SYN{i:03d}" for i in range(n_symbols)], barres
+
+
+def bars_from_store(store, tickers, interval="1d"):
+    """Barres stockées (stockage.BarStore) de plusieurs tickers, fusionnées par date."""
+    morceaux = []
+    for i, ticker in enumerate(tickers):
+        df = store.read(ticker, interval=interval)
+        bloc = np.zeros(len(df), dtype=RECORD_DTYPE)
+        bloc['symbol'] = i
+        bloc['seq'] = np.arange(len(df))
+        bloc['ts'] = df.index.asi8 / 1e9
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            bloc[col] = df[col.capitalize()].to_numpy()
+        morceaux.append(bloc)
+    barres = np.concatenate(morceaux)
+    return list(tickers), barres[np.argsort(barres['ts'], kind='stable')]
+
+
+# ============================================================================
+# 2️⃣ SERVEUR DE FLUX
+# ============================================================================
+
+async def _envoyer(writer, symbols, barres, rate, chunk):
+    """Envoie toutes les barres au client en respectant `rate` barres/seconde."""
+    entete = json.dumps({'symbols': symbols, 'record_size': RECORD_DTYPE.itemsize,
+                         'count': len(barres)}) + "\n"
+    writer.write(entete.encode())
+
+    tampon = barres.copy()
+    debut = time.monotonic()
+    envoye = 0
+    while envoye < len(tampon):
+        if rate > 0:
+            # Nombre de barres qui devraient être parties à cet instant
+            cible = min(len(tampon), int((time.monotonic() - debut) * rate) + 1)
+            if cible <= envoye:
+                await asyncio.sleep(min(0.001, (envoye + 1 - cible) / rate))
+                continue
+            fin = min(cible, envoye + chunk)
+        else:
+            fin = min(len(tampon), envoye + chunk)
+
+        lot = tampon[envoye:fin]
+        lot['sent_ns'] = time.monotonic_ns()
+        writer.write(lot.tobytes())
+        await writer.drain()
+        envoye = fin
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def serve_feed(address, symbols, barres, rate=10_000, chunk=256, ready=None):
+    """
+    Lance le serveur de flux (chaque client reçoit le flux complet).
+
+    Args:
+        address : chemin de socket Unix, ou (host, port) pour TCP
+        rate : barres par seconde (0 = aussi vite que possible)
+        chunk : nombre maximal de barres par écriture
+        ready : multiprocessing.Event signalé quand le serveur écoute
+    """
+    async def client(reader, writer):
+        await _envoyer(writer, symbols, barres, rate, chunk)
+
+    if isinstance(address, (tuple, list)):
+        serveur = await asyncio.start_server(client, address[0], address[1])
+    else:
+        if os.path.exists(address):
+            os.unlink(address)
+        serveur = await asyncio.start_unix_server(client, path=address)
+
+    if ready is not None:
+        ready.set()
+    async with serveur:
+        await serveur.serve_forever()
+
+
+def _processus_serveur(address, symbols, barres, rate, chunk, ready):
+    try:
+        asyncio.run(serve_feed(address, symbols, barres, rate, chunk, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+def start_feed_process(address, symbols, barres, rate=10_000, chunk=256):
+    """Démarre le serveur dans un processus séparé et attend qu'il écoute."""
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=_processus_serveur,
+                                   args=(address, symbols, barres, rate, chunk, ready), daemon=True)
+    proc.start()
+    if not ready.wait(10):
+        proc.terminate()
+        raise RuntimeError("Le serveur de flux n'a pas démarré")
+    return proc
+
+
+# ============================================================================
+# 3️⃣ CLIENT / MOTEUR
+# ============================================================================
+
+def _connecter(address):
+    if isinstance(address, (tuple, list)):
+        sock = socket.create_connection(tuple(address))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    return sock
+
+
+def consume_feed(address, engine_factory=None, on_event=None, buffer_bars=4096):
+    """
+    Se connecte au flux et fait passer chaque barre dans un moteur par symbole.
+
+    Args:
+        engine_factory : callable() → objet avec update(date, high, low, close)
+                         (défaut : StreamingBacktester)
+        on_event : callable(symbole, événement) optionnel
+
+    Returns:
+        dict : bars, seconds, latencies_us (np.ndarray), engines {symbole: moteur}
+    """
+    if engine_factory is None:
+        from backtest import StreamingBacktester
+        engine_factory = StreamingBacktester
+
+    sock = _connecter(address)
+    fichier = sock.makefile('rb')
+    entete = json.loads(fichier.readline())
+    symbols = entete['symbols']
+    taille = entete['record_size']
+    moteurs = [engine_factory() for _ in symbols]
+    latences = np.empty(entete.get('count', 0) or 1_000_000, dtype=np.int64)
+
+    n = 0
+    debut = None
+    reste = b""
+    while True:
+        donnees = fichier.read1(buffer_bars * taille)
+        if not donnees:
+            break
+        if debut is None:
+            debut = time.perf_counter()
+        donnees = reste + donnees
+        complet = len(donnees) // taille * taille
+        reste = donnees[complet:]
+        lot = np.frombuffer(donnees[:complet], dtype=RECORD_DTYPE)
+
+        # Colonnes converties une fois par lot en listes Python (plus rapide par barre)
+        for s, ts, h, l, c, envoi in zip(lot['symbol'].tolist(), lot['ts'].tolist(),
+                                         lot['high'].tolist(), lot['low'].tolist(),
+                                         lot['close'].tolist(), lot['sent_ns'].tolist()):
+            evenement = moteurs[s].update(ts, h, l, c)
+            if n == len(latences):
+                latences = np.resize(latences, 2 * n)
+            latences[n] = time.monotonic_ns() - envoi
+            n += 1
+            if on_event is not None:
+                on_event(symbols[s], evenement)
+
+    duree = time.perf_counter() - debut if debut is not None else 0.0
+    fichier.close()
+    sock.close()
+    return {'bars': n, 'seconds': duree, 'latencies_us': latences[:n] / 1000.0,
+            'engines': dict(zip(symbols, moteurs))}
+
+
+# ============================================================================
+# 4️⃣ TEST DE CHARGE
+# ============================================================================
+
+def _resume(rate, resultat):
+    lat = resultat['latencies_us']
+    debit = resultat['bars'] / resultat['seconds'] if resultat['seconds'] > 0 else 0.0
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (0.0, 0.0, 0.0)
+    return {
+        'target_rate': rate,
+        'achieved_rate': round(debit),
+        'bars': resultat['bars'],
+        'p50_us': round(float(p50), 1),
+        'p95_us': round(float(p95), 1),
+        'p99_us': round(float(p99), 1),
+        'max_us': round(float(lat.max()), 1) if len(lat) else 0.0,
+    }
+
+
+def run_load_test(rates=(1_000, 5_000, 10_000, 20_000, 50_000, 0), n_symbols=50, seconds=3.0,
+                  max_p99_ms=50.0, address=None, barres=None, symbols=None):
+    """
+    Mesure latences et débit de la chaîne complète pour plusieurs vitesses de flux.
+
+    Chaque palier dure environ `seconds` secondes. Un palier est "tenu" si le débit
+    atteint ≥ 95 % de la cible et si la latence p99 reste sous `max_p99_ms`.
+    Le palier rate=0 (flux à vitesse maximale) donne le débit plafond du moteur.
+
+    Returns:
+        dict : paliers (liste de résumés), max_sustainable_rate, max_rate
+    """
+    if address is None:
+        address = os.path.join(tempfile.mkdtemp(), "flux.sock")
+
+    paliers = []
+    for rate in rates:
+        if barres is None or symbols is None:
+            n_bars = max(200, int((rate or 50_000) * seconds / n_symbols))
+            noms, lot = synthetic_bars(n_symbols, n_bars)
+        else:
+            noms, lot = symbols, barres
+
+        proc = start_feed_process(address, noms, lot, rate=rate)
+        try:
+            resume = _resume(rate, consume_feed(address))
+        finally:
+            proc.terminate()
+            proc.join()
+        paliers.append(resume)
+        print(f"  cible {rate or 'max':>7} barres/s → {resume['achieved_rate']:>7} barres/s | "
+              f"p50 {resume['p50_us']:>9.1f} µs  p99 {resume['p99_us']:>10.1f} µs  max {resume['max_us']:>10.1f} µs")
+
+    tenus = [p['target_rate'] for p in paliers
+             if p['target_rate'] > 0 and p['achieved_rate'] >= 0.95 * p['target_rate']
+             and p['p99_us'] <= max_p99_ms * 1000]
+    return {
+        'paliers': paliers,
+        'max_sustainable_rate': max(tenus) if tenus else 0,
+        'max_rate': max(p['achieved_rate'] for p in paliers),
+    }
+
+
+# ============================================================================
+# 5️⃣ ZONE DE TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    print("🧪 TEST SIMULATEUR.PY : flux local + chaîne indicateurs → signal → simulation")
+    print("=" * 70)
+    resultat = run_load_test()
+    print(f"\n✅ Débit max tenu (p99 < 50 ms) : {resultat['max_sustainable_rate']} barres/s, "
+          f"plafond moteur : {resultat['max_rate']} barres/s")
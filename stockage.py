@@ -0,0 +1,70 @@
+# stockage.py - Store local de barres OHLCV (Parquet, un fichier par ticker et intervalle)
+#
+# Les DataFrames stockés ont le même format que get_market_data :
+# index DatetimeIndex 'Date', colonnes Open / High / Low / Close / Volume.
+# Ils peuvent donc être passés directement à add_indicators et au backtester.
+
+import os
+import re
+
+import pandas as pd
+
+
+class BarStore:
+    """
+    Store de barres sur disque.
+
+    Exemple :
+        store = BarStore("donnees_marche")
+        store.write("GC=F", df)
+        df = store.read("GC=F", start="2024-01-01")
+    """
+
+    def __init__(self, root="donnees_marche"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, ticker, interval="1d"):
+        # '^NDX' ou 'GC=F' sont des noms de fichier valides ; seuls '/' et '\' posent problème
+        nom = re.sub(r'[\\/:*?"<>|]', '_', ticker)
+        return os.path.join(self.root, interval, f"{nom}.parquet")
+
+    def exists(self, ticker, interval="1d"):
+        return os.path.exists(self.path(ticker, interval))
+
+    def write(self, ticker, df, interval="1d", append=False):
+        """
+        Écrit les barres d'un ticker (écriture atomique : fichier temporaire + os.replace).
+
+        Args:
+            append : fusionne avec les barres déjà stockées (les nouvelles gagnent
+                     en cas de date en double)
+
+        Returns:
+            nombre de barres stockées pour ce ticker
+        """
+        chemin = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+        if append and os.path.exists(chemin):
+            df = pd.concat([pd.read_parquet(chemin), df])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        temporaire = chemin + ".tmp"
+        df.to_parquet(temporaire)
+        os.replace(temporaire, chemin)
+        return len(df)
+
+    def read(self, ticker, interval="1d", start=None, end=None, columns=None):
+        """Relit les barres d'un ticker, éventuellement filtrées par dates."""
+        df = pd.read_parquet(self.path(ticker, interval), columns=columns)
+        if start is not None or end is not None:
+            df = df.loc[start:end]
+        return df
+
+    def tickers(self, interval="1d"):
+        """Liste des tickers présents pour un intervalle (noms de fichiers)."""
+        dossier = os.path.join(self.root, interval)
+        if not os.path.isdir(dossier):
+            return []
+        return sorted(f[:-len(".parquet")] for f in os.listdir(dossier) if f.endswith(".parquet"))